@@ -2,12 +2,6 @@
 
 import logging
 import sys
-from pathlib import Path
-
-from waitress import serve
-
-# Add src to path for imports
-sys.path.insert(0, str(Path(__file__).parent))
 
 from src.config import env_config
 from src.models import AppConfig
@@ -45,14 +39,19 @@ def main() -> None:
 
     logger.info(f"Socket path: {socket_path}")
     logger.info(f"Worker threads: {env_config.worker_threads}")
+    logger.info(f"Connection limit: {env_config.connection_limit}")
     logger.info("Application ready to accept requests")
 
+    # Imported here so that importing this module stays cheap
+    from waitress import serve
+
     # Serve application
     serve(
         app,
         unix_socket=socket_path,
         unix_socket_perms="0666",
         threads=env_config.worker_threads,
+        connection_limit=env_config.connection_limit,
         ident="",
     )
 
@@ -2,10 +2,6 @@
 
 import logging
 import sys
-from pathlib import Path
-
-# Add src to path for imports
-sys.path.insert(0, str(Path(__file__).parent))
 
 from src.config import env_config
 from src.models import AppConfig
@@ -1,11 +1,69 @@
 """Base configuration builder interface."""
 
-from typing import Protocol
+import threading
+from collections.abc import Sequence
+from typing import Any, Protocol
 
 from ..models import Server, UserInfo
 from ..utils import SpiderXGenerator
 
 
+def fast_clone(obj: Any) -> Any:
+    """Clone a JSON-like template structure.
+
+    Much cheaper than ``copy.deepcopy`` for parsed JSON/YAML data: only
+    dicts and lists are rebuilt, scalar values are immutable and shared.
+
+    Args:
+        obj: Template value (dict, list or scalar)
+
+    Returns:
+        Independent copy of all nested dicts and lists
+    """
+    if isinstance(obj, dict):
+        return {key: fast_clone(value) for key, value in obj.items()}
+    if isinstance(obj, list):
+        return [fast_clone(item) for item in obj]
+    return obj
+
+
+class _EligibleServersCache:
+    """Eligible server lists for the current servers list, keyed by user groups.
+
+    Eligibility depends only on the user's groups, so users sharing a group set
+    share one entry. Only tuples are cached: the repository returns the same
+    tuple until the servers file changes, so a new tuple identity drops every
+    entry, and a tuple cannot change behind the cache's back the way a list can.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty cache."""
+        self._lock = threading.Lock()
+        self._source: tuple[Server, ...] | None = None
+        self._by_groups: dict[frozenset[str], list[Server]] = {}
+
+    def get(self, servers: tuple[Server, ...], groups: frozenset[str]) -> list[Server] | None:
+        """Get the cached eligible servers for a servers tuple and group set."""
+        with self._lock:
+            if self._source is not servers:
+                return None
+            return self._by_groups.get(groups)
+
+    def put(
+        self, servers: tuple[Server, ...], groups: frozenset[str], eligible: list[Server]
+    ) -> None:
+        """Store eligible servers, dropping entries for any older servers tuple."""
+        with self._lock:
+            if self._source is not servers:
+                # Holding the sequence keeps its id from being reused while cached
+                self._source = servers
+                self._by_groups = {}
+            self._by_groups[groups] = eligible
+
+
+_eligible_cache = _EligibleServersCache()
+
+
 class ConfigBuilder(Protocol):
     """Protocol for configuration builders.
 
@@ -15,7 +73,7 @@ class ConfigBuilder(Protocol):
 
     def build(
         self,
-        servers: list[Server],
+        servers: Sequence[Server],
         user: UserInfo,
     ) -> bytes:
         """Build configuration for the given servers and user.
@@ -33,82 +91,58 @@ class ConfigBuilder(Protocol):
 class BaseConfigBuilder:
     """Base class with common functionality for all builders."""
 
-    @staticmethod
-    def filter_servers_for_user(servers: list[Server], user: UserInfo) -> list[Server]:
-        """Filter servers that are accessible by the given user.
-
-        Uses the new group-based filtering system with legacy support.
+    def get_eligible_servers(self, servers: Sequence[Server], user: UserInfo) -> list[Server]:
+        """Get eligible servers for user (filtered and deduplicated).
 
         Args:
             servers: List of all servers
-            user: User to filter for
+            user: User to get servers for
 
         Returns:
-            List of accessible servers
+            List of eligible unique servers
         """
-        # Filter servers based on group access
-        return [server for server in servers if user.has_access_to_groups(server.groups)]
-
-    @staticmethod
-    def deduplicate_by_host(servers: list[Server]) -> list[Server]:
-        """Remove duplicate servers with the same host.
-
-        Keeps the first occurrence of each unique host.
+        user_groups = user.groups
+        # Mutable sequences may change between calls, so only tuples are memoized
+        cacheable = type(servers) is tuple
+        if cacheable:
+            cached = _eligible_cache.get(servers, user_groups)
+            if cached is not None:
+                return list(cached)
 
-        Args:
-            servers: List of servers potentially with duplicates
-
-        Returns:
-            List of servers with unique hosts
-        """
         seen_hosts: set[str] = set()
-        unique_servers: list[Server] = []
+        eligible: list[Server] = []
 
+        # Filter by group access and deduplicate by host in a single pass
         for server in servers:
-            if server.host not in seen_hosts:
-                seen_hosts.add(server.host)
-                unique_servers.append(server)
+            if not user.has_access_to_groups(server.groups):
+                continue
 
-        return unique_servers
+            host = server.host
+            if host in seen_hosts:
+                continue
 
-    def get_eligible_servers(self, servers: list[Server], user: UserInfo) -> list[Server]:
-        """Get eligible servers for user (filtered and deduplicated).
+            seen_hosts.add(host)
+            eligible.append(server)
 
-        Args:
-            servers: List of all servers
-            user: User to get servers for
+        if not cacheable:
+            return eligible
 
-        Returns:
-            List of eligible unique servers
-        """
-        filtered = self.filter_servers_for_user(servers, user)
-        return self.deduplicate_by_host(filtered)
+        _eligible_cache.put(servers, user_groups, eligible)
+        return list(eligible)
 
     @staticmethod
-    def generate_spider_x(
-        server: Server,
-        used_paths: set[str],
-        generator: SpiderXGenerator,
-        max_attempts: int = 8,
-    ) -> str:
-        """Generate unique spider-x path for non-external servers.
+    def generate_spider_x_paths(
+        servers: Sequence[Server], generator: SpiderXGenerator
+    ) -> list[str]:
+        """Generate unique spider-x paths for a list of servers in one batch.
 
         Args:
-            server: Server to generate path for
-            used_paths: Set of already used paths
+            servers: Servers to generate paths for
             generator: Spider-x generator instance
-            max_attempts: Max attempts to find a unique path
 
         Returns:
-            Spider-x path or empty string for external servers
+            Paths aligned with servers (empty string for external servers)
         """
-        if server.is_external:
-            return ""
-
-        for _ in range(max_attempts):
-            path = generator.generate()
-            if path not in used_paths:
-                used_paths.add(path)
-                return path
-
-        return ""
+        internal_count = sum(1 for server in servers if not server.is_external)
+        paths = iter(generator.generate_many(internal_count))
+        return ["" if server.is_external else next(paths) for server in servers]
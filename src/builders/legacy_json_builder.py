@@ -1,19 +1,37 @@
 """Legacy JSON configuration builder for older V2Ray clients."""
 
-import copy
 import json
 import logging
-from collections.abc import Callable
-from typing import Any
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from typing import Any, Final
 
 from ..constants import DNS_PLACEHOLDERS
 from ..models import Server, UserInfo
 from ..utils import SpiderXGenerator
-from .base import BaseConfigBuilder
+from .base import BaseConfigBuilder, fast_clone
 
 JsonDict = dict[str, Any]
 logger = logging.getLogger(__name__)
 
+# No indentation: the C encoder is only used for compact output
+_JSON_ENCODER: Final[json.JSONEncoder] = json.JSONEncoder(ensure_ascii=False)
+
+
+@dataclass(frozen=True)
+class _OutboundPlan:
+    """Patches needed by one outbound of a template block."""
+
+    index: int
+    patch_address: bool
+    patch_id: bool
+    patch_reality: bool
+
+
+def _is_unset(value: Any) -> bool:
+    """Check whether a template field is empty or a "null" placeholder."""
+    return not value or str(value).lower() == "null"
+
 
 class LegacyJsonBuilder(BaseConfigBuilder):
     """Builder for legacy V2Ray JSON configuration format.
@@ -38,7 +56,7 @@ class LegacyJsonBuilder(BaseConfigBuilder):
 
     def build(
         self,
-        servers: list[Server],
+        servers: Sequence[Server],
         user: UserInfo,
         user_agent: str = "",
     ) -> bytes:
@@ -63,35 +81,56 @@ class LegacyJsonBuilder(BaseConfigBuilder):
             logger.warning(f"No eligible servers for user {user.link_path}")
             raise ValueError("User has no access to any servers")
 
-        # Build configuration blocks
-        configurations: list[JsonDict] = []
-        used_paths: set[str] = set()
-
-        for server in eligible:
-            spider_x = self.generate_spider_x(server, used_paths, self.spiderx_generator)
-
-            # Create one config block per template per server
-            for template_block in base_blocks:
-                config = self._build_config_block(template_block, server, user, spider_x)
-                configurations.append(config)
-
-        return json.dumps(configurations, ensure_ascii=False, indent=2).encode("utf-8")
+        # Build one config block per template per server, lazily
+        spider_paths = self.generate_spider_x_paths(eligible, self.spiderx_generator)
+        user_id = user.id
+        user_short_id = user.get_short_id()
+        plans = [self._plan_outbounds(template_block) for template_block in base_blocks]
+        configurations = (
+            self._build_config_block(
+                template_block,
+                plan,
+                server,
+                server.fixed_id or user_id,
+                server.fixed_short_id or user_short_id,
+                spider_x,
+            )
+            for server, spider_x in zip(eligible, spider_paths, strict=True)
+            for template_block, plan in zip(base_blocks, plans, strict=True)
+        )
+
+        # Serialize block by block so only one block dict is alive at a time
+        output = bytearray(b"[")
+        for index, config in enumerate(configurations):
+            if index:
+                output += b", "
+            output += _JSON_ENCODER.encode(config).encode("utf-8")
+        output += b"]"
+        return bytes(output)
 
     def _build_config_block(
-        self, template: JsonDict, server: Server, user: UserInfo, spider_x: str
+        self,
+        template: JsonDict,
+        plan: tuple[_OutboundPlan, ...],
+        server: Server,
+        server_id: str,
+        short_id: str,
+        spider_x: str,
     ) -> JsonDict:
         """Build a single configuration block from template.
 
         Args:
             template: Template configuration block
+            plan: Outbound patch plan for the template
             server: Server configuration
-            user: User credentials
+            server_id: UUID to connect with (fixed server ID or user ID)
+            short_id: Reality short ID (fixed server short ID or user short ID)
             spider_x: Spider-X path
 
         Returns:
             Configuration block dictionary
         """
-        config = copy.deepcopy(template)
+        config = fast_clone(template)
 
         # Update remarks
         original_remarks = config.get("remarks", "")
@@ -101,7 +140,7 @@ class LegacyJsonBuilder(BaseConfigBuilder):
         self._apply_dns_override(config, server.dns_override)
 
         # Patch outbound configurations
-        self._patch_outbounds(config, server, user, spider_x)
+        self._patch_outbounds(config, plan, server, server_id, short_id, spider_x)
 
         return config
 
@@ -123,104 +162,103 @@ class LegacyJsonBuilder(BaseConfigBuilder):
         if not isinstance(servers, list):
             return
 
-        # Replace DNS placeholders
-        dns_config["servers"] = [
-            dns_override if (isinstance(s, str) and s in DNS_PLACEHOLDERS) else s for s in servers
-        ]
+        # The block is already a private clone, so replace placeholders in place
+        for index, dns_server in enumerate(servers):
+            if isinstance(dns_server, str) and dns_server in DNS_PLACEHOLDERS:
+                servers[index] = dns_override
 
-    def _patch_outbounds(
-        self, config: JsonDict, server: Server, user: UserInfo, spider_x: str
-    ) -> None:
-        """Patch outbound configurations with server details.
+    @staticmethod
+    def _plan_outbounds(template: JsonDict) -> tuple[_OutboundPlan, ...]:
+        """Work out which outbounds of a template block need patching.
+
+        Every block built from a template has the same outbound layout, so
+        the security and placeholder checks only need to run once per build.
 
         Args:
-            config: Configuration to modify
-            server: Server configuration
-            user: User credentials
-            spider_x: Spider-X path
+            template: Template configuration block
+
+        Returns:
+            Patch plan for each outbound that needs any patching
         """
-        outbounds = config.get("outbounds")
+        outbounds = template.get("outbounds")
         if not isinstance(outbounds, list):
-            return
+            return ()
+
+        plan: list[_OutboundPlan] = []
+        for index, outbound in enumerate(outbounds):
+            patch_address = patch_id = False
+            settings = outbound.get("settings")
+            if isinstance(settings, dict):
+                patch_address = _is_unset(settings.get("address"))
+                patch_id = _is_unset(settings.get("id"))
 
-        for outbound in outbounds:
-            self._patch_outbound(outbound, server, user, spider_x)
+            stream_settings = outbound.get("streamSettings")
+            patch_reality = (
+                isinstance(stream_settings, dict)
+                and str(stream_settings.get("security", "")).lower() == "reality"
+                and isinstance(stream_settings.get("realitySettings"), dict)
+            )
 
-    def _patch_outbound(
-        self, outbound: JsonDict, server: Server, user: UserInfo, spider_x: str
+            if patch_address or patch_id or patch_reality:
+                plan.append(_OutboundPlan(index, patch_address, patch_id, patch_reality))
+
+        return tuple(plan)
+
+    def _patch_outbounds(
+        self,
+        config: JsonDict,
+        plan: tuple[_OutboundPlan, ...],
+        server: Server,
+        server_id: str,
+        short_id: str,
+        spider_x: str,
     ) -> None:
-        """Patch a single outbound configuration.
+        """Patch outbound configurations with server details.
 
         Args:
-            outbound: Outbound configuration to modify
+            config: Configuration to modify
+            plan: Outbound patch plan for the block's template
             server: Server configuration
-            user: User credentials
+            server_id: UUID to connect with
+            short_id: Reality short ID
             spider_x: Spider-X path
         """
-        # Patch settings
-        settings = outbound.get("settings")
-        if isinstance(settings, dict):
-            self._patch_settings(settings, server, user)
-
-        # Patch stream settings for Reality
-        stream_settings = outbound.get("streamSettings")
-        if isinstance(stream_settings, dict):
-            self._patch_reality_settings(stream_settings, server, user, spider_x)
-
-    def _patch_settings(self, settings: JsonDict, server: Server, user: UserInfo) -> None:
-        """Patch settings configuration.
-
-        Handles settings with direct fields like:
-        {
-          "address": "example.com",
-          "port": 443,
-          "id": "uuid",
-          "encryption": "none",
-          "flow": "xtls-rprx-vision",
-          "level": 0,
-          "reverse": {}
-        }
+        if not plan:
+            return
 
-        Args:
-            settings: Settings configuration to modify
-            server: Server configuration
-            user: User credentials
-        """
-        # Patch address
-        address = settings.get("address")
-        if not address or str(address).lower() == "null":
-            settings["address"] = server.host
+        outbounds = config["outbounds"]
+        for step in plan:
+            outbound = outbounds[step.index]
+
+            # Patch address and user ID in settings
+            if step.patch_address:
+                outbound["settings"]["address"] = server.host
+            if step.patch_id:
+                outbound["settings"]["id"] = server_id
 
-        # Patch user ID
-        user_id = settings.get("id")
-        if not user_id or str(user_id).lower() == "null":
-            settings["id"] = server.fixed_id or user.id
+            # Patch stream settings for Reality
+            if step.patch_reality:
+                self._patch_reality_settings(
+                    outbound["streamSettings"]["realitySettings"], server, short_id, spider_x
+                )
 
     def _patch_reality_settings(
-        self, stream_settings: JsonDict, server: Server, user: UserInfo, spider_x: str
+        self, reality_settings: JsonDict, server: Server, short_id: str, spider_x: str
     ) -> None:
         """Patch Reality protocol settings.
 
         Args:
-            stream_settings: Stream settings to modify
+            reality_settings: Reality settings to modify
             server: Server configuration
-            user: User credentials
+            short_id: Reality short ID
             spider_x: Spider-X path
         """
-        security = str(stream_settings.get("security", "")).lower()
-        if security != "reality":
-            return
-
-        reality_settings = stream_settings.get("realitySettings")
-        if not isinstance(reality_settings, dict):
-            return
-
         # Set server name
         if server.alias:
             reality_settings["serverName"] = server.alias
 
         # Set short ID
-        reality_settings["shortId"] = server.fixed_short_id or user.get_short_id()
+        reality_settings["shortId"] = short_id
 
         # Set spider-X (empty for external servers)
         reality_settings["spiderX"] = "" if server.is_external else spider_x
@@ -1,18 +1,25 @@
 """Mihomo (Clash Meta) configuration builder."""
 
-import copy
 import logging
-from collections.abc import Callable
-from typing import Any
+from collections.abc import Callable, Sequence
+from typing import Any, Final
 
 import yaml
 
+try:
+    from yaml import CSafeDumper as YamlDumper
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeDumper as YamlDumper
+
 from ..models import Server, UserInfo
-from .base import BaseConfigBuilder
+from .base import BaseConfigBuilder, fast_clone
 
 JsonDict = dict[str, Any]
 logger = logging.getLogger(__name__)
 
+# Placeholder expanded into the list of generated proxy names
+_PROXY_NAMES_PLACEHOLDER: Final[str] = "__PROXY_NAMES__"
+
 
 class MihomoBuilder(BaseConfigBuilder):
     """Builder for Mihomo/Clash Meta YAML configurations.
@@ -34,7 +41,7 @@ class MihomoBuilder(BaseConfigBuilder):
 
     def build(
         self,
-        servers: list[Server],
+        servers: Sequence[Server],
         user: UserInfo,
         template_name: str | None = None,
         user_agent: str = "",
@@ -57,7 +64,8 @@ class MihomoBuilder(BaseConfigBuilder):
             logger.error(f"Invalid Mihomo template type: {type(template)}, expected dict")
             raise ValueError("Mihomo template must be a dictionary")
 
-        config = copy.deepcopy(template)
+        # Private copy of the cached template; everything below may mutate it
+        config = fast_clone(template)
 
         # Get eligible servers
         eligible = self.get_eligible_servers(servers, user)
@@ -70,11 +78,15 @@ class MihomoBuilder(BaseConfigBuilder):
 
         # Build proxy configurations
         proxy_template = config.get("proxy-template", {})
-        generated_proxies = [self._build_proxy(proxy_template, server, user) for server in eligible]
+        user_id = user.id
+        user_short_id = user.get_short_id()
+        generated_proxies = [
+            self._build_proxy(proxy_template, server, user_id, user_short_id) for server in eligible
+        ]
 
         existing_proxies = config.get("proxies")
         if isinstance(existing_proxies, list):
-            config["proxies"] = copy.deepcopy(existing_proxies) + generated_proxies
+            config["proxies"] = existing_proxies + generated_proxies
         else:
             config["proxies"] = generated_proxies
 
@@ -84,36 +96,40 @@ class MihomoBuilder(BaseConfigBuilder):
         # Substitute proxy names in groups and rules
         for key in ("proxy-groups", "rule-providers", "rules"):
             if key in config:
-                config[key] = self._substitute_names(copy.deepcopy(config[key]), proxy_names)
-
-        # Convert to YAML
-        yaml_content = yaml.safe_dump(config, sort_keys=False, allow_unicode=True)
+                config[key] = self._substitute_names(config[key], proxy_names)
 
-        return yaml_content.encode("utf-8")
+        # Convert to YAML; the emitter writes UTF-8 bytes directly, so no
+        # intermediate str of the whole document is built and re-encoded
+        return yaml.dump(
+            config, Dumper=YamlDumper, sort_keys=False, allow_unicode=True, encoding="utf-8"
+        )
 
-    def _build_proxy(self, template: JsonDict, server: Server, user: UserInfo) -> JsonDict:
+    def _build_proxy(
+        self, template: JsonDict, server: Server, user_id: str, user_short_id: str
+    ) -> JsonDict:
         """Build a single proxy configuration from template.
 
         Args:
             template: Proxy template configuration
             server: Server to build proxy for
-            user: User credentials
+            user_id: User UUID
+            user_short_id: User Reality short ID
 
         Returns:
             Proxy configuration dictionary
         """
-        proxy = copy.deepcopy(template)
+        proxy = fast_clone(template)
 
         # Set basic proxy parameters
         proxy["name"] = server.description
         proxy["server"] = server.host
-        proxy["uuid"] = server.fixed_id or user.id
+        proxy["uuid"] = server.fixed_id or user_id
         proxy["servername"] = server.server_name
 
         # Set Reality options if present
         reality_opts = proxy.get("reality-opts")
         if isinstance(reality_opts, dict):
-            reality_opts["short-id"] = server.fixed_short_id or user.get_short_id()
+            reality_opts["short-id"] = server.fixed_short_id or user_short_id
 
             if server.public_key:
                 reality_opts["public-key"] = server.public_key
@@ -121,33 +137,51 @@ class MihomoBuilder(BaseConfigBuilder):
         return proxy
 
     def _substitute_names(self, obj: Any, proxy_names: list[str]) -> Any:
-        """Recursively substitute __PROXY_NAMES__ placeholder.
+        """Substitute __PROXY_NAMES__ placeholder while cloning the structure.
+
+        Walks nested dicts and lists iteratively in a single pass. A placeholder
+        list item is expanded in place into the proxy names; a placeholder
+        value anywhere else is replaced by the list of proxy names.
 
         Args:
             obj: Object to process (dict, list, str, or other)
             proxy_names: List of proxy names to substitute
 
         Returns:
-            Processed object with substitutions
+            Processed copy of the object with substitutions
         """
         if isinstance(obj, str):
-            # Replace placeholder with proxy names list
-            return list(proxy_names) if obj == "__PROXY_NAMES__" else obj
-
-        if isinstance(obj, list):
-            result: list[Any] = []
-            for item in obj:
-                substituted = self._substitute_names(item, proxy_names)
-
-                # Flatten lists (when placeholder was substituted)
-                if isinstance(substituted, list):
-                    result.extend(substituted)
+            return list(proxy_names) if obj == _PROXY_NAMES_PLACEHOLDER else obj
+        if not isinstance(obj, dict | list):
+            return obj
+
+        root: dict[str, Any] | list[Any] = {} if isinstance(obj, dict) else []
+        stack: list[tuple[Any, Any]] = [(obj, root)]
+
+        while stack:
+            source, target = stack.pop()
+
+            if isinstance(source, dict):
+                for key, value in source.items():
+                    if isinstance(value, str) and value == _PROXY_NAMES_PLACEHOLDER:
+                        target[key] = list(proxy_names)
+                    elif isinstance(value, dict | list):
+                        child = {} if isinstance(value, dict) else []
+                        target[key] = child
+                        stack.append((value, child))
+                    else:
+                        target[key] = value
+                continue
+
+            for item in source:
+                if isinstance(item, str) and item == _PROXY_NAMES_PLACEHOLDER:
+                    # Flatten proxy names into the enclosing list
+                    target.extend(proxy_names)
+                elif isinstance(item, dict | list):
+                    child = {} if isinstance(item, dict) else []
+                    target.append(child)
+                    stack.append((item, child))
                 else:
-                    result.append(substituted)
-
-            return result
-
-        if isinstance(obj, dict):
-            return {key: self._substitute_names(value, proxy_names) for key, value in obj.items()}
+                    target.append(item)
 
-        return obj
+        return root
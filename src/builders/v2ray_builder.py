@@ -1,8 +1,11 @@
 """V2Ray subscription link builder."""
 
 import logging
+import re
 import urllib.parse
-from collections.abc import Callable
+from collections.abc import Callable, Sequence
+from functools import lru_cache
+from typing import Final
 
 from ..models import Server, UserInfo
 from ..utils import SpiderXGenerator
@@ -10,6 +13,27 @@ from .base import BaseConfigBuilder
 
 logger = logging.getLogger(__name__)
 
+# Placeholders supported in V2Ray link templates
+_PLACEHOLDER_PATTERN: Final[re.Pattern[str]] = re.compile(
+    r"(<ID>|<ADDRESS>|<SPIDERX>|<SHORTID>|<SERVERNAME>|<NAME>|<PBK>)"
+)
+
+
+@lru_cache(maxsize=32)
+def _compile_template(template: str) -> tuple[tuple[str, ...], tuple[tuple[int, str], ...]]:
+    """Split link template into literal segments and placeholder slots.
+
+    Args:
+        template: URL template with placeholders
+
+    Returns:
+        Tuple of (tokens, slots) where slots are (token index, placeholder) pairs
+    """
+    tokens = tuple(_PLACEHOLDER_PATTERN.split(template))
+    # re.split with a capture group puts matched placeholders at odd indexes
+    slots = tuple((index, tokens[index]) for index in range(1, len(tokens), 2))
+    return tokens, slots
+
 
 class V2RayBuilder(BaseConfigBuilder):
     """Builder for V2Ray subscription format.
@@ -34,7 +58,7 @@ class V2RayBuilder(BaseConfigBuilder):
 
     def build(
         self,
-        servers: list[Server],
+        servers: Sequence[Server],
         user: UserInfo,
         user_agent: str = "",
     ) -> bytes:
@@ -53,55 +77,66 @@ class V2RayBuilder(BaseConfigBuilder):
             logger.warning("V2Ray template is empty")
             return b""
 
-        template = template.strip()
+        compiled = _compile_template(template.strip())
         eligible = self.get_eligible_servers(servers, user)
 
         if not eligible:
             logger.warning(f"No eligible servers for user {user.link_path}")
             raise ValueError("User has no access to any servers")
 
-        # Generate links
-        links: list[str] = []
-        used_paths: set[str] = set()
+        # Write links straight into the output buffer, one per line
+        output = bytearray()
+        spider_paths = self.generate_spider_x_paths(eligible, self.spiderx_generator)
+        user_id = user.id
+        user_short_id = user.get_short_id()
 
-        for server in eligible:
-            spider_x = self.generate_spider_x(server, used_paths, self.spiderx_generator)
-            link = self._build_link(template, server, user, spider_x)
-            links.append(link)
+        for index, (server, spider_x) in enumerate(zip(eligible, spider_paths, strict=True)):
+            if index:
+                output += b"\n"
+            link = self._build_link(compiled, server, user_id, user_short_id, spider_x)
+            output += link.encode("utf-8")
 
-        return "\n".join(links).encode("utf-8")
+        return bytes(output)
 
-    def _build_link(self, template: str, server: Server, user: UserInfo, spider_x: str) -> str:
-        """Build a single subscription link from template.
+    def _build_link(
+        self,
+        compiled: tuple[tuple[str, ...], tuple[tuple[int, str], ...]],
+        server: Server,
+        user_id: str,
+        user_short_id: str,
+        spider_x: str,
+    ) -> str:
+        """Build a single subscription link from compiled template.
 
         Args:
-            template: URL template with placeholders
+            compiled: Template tokens and placeholder slots
             server: Server configuration
-            user: User credentials
+            user_id: User UUID
+            user_short_id: User Reality short ID
             spider_x: Spider-X path
 
         Returns:
             Complete subscription URL
         """
-        # URL-encode values
-        server_name = urllib.parse.quote(server.server_name, safe="")
-        description = urllib.parse.quote(server.description, safe="")
+        tokens, slots = compiled
+
+        # URL-encode values (server fields are cached on the model)
         spider_x_encoded = urllib.parse.quote(spider_x, safe="")
 
         # Prepare replacements
         replacements = {
-            "<ID>": server.fixed_id or user.id,
+            "<ID>": server.fixed_id or user_id,
             "<ADDRESS>": server.host,
             "<SPIDERX>": spider_x_encoded,
-            "<SHORTID>": server.fixed_short_id or user.get_short_id(),
-            "<SERVERNAME>": server_name,
-            "<NAME>": description,
+            "<SHORTID>": server.fixed_short_id or user_short_id,
+            "<SERVERNAME>": server.encoded_server_name,
+            "<NAME>": server.encoded_description,
             "<PBK>": server.public_key or "",
         }
 
-        # Apply replacements
-        link = template
-        for placeholder, value in replacements.items():
-            link = link.replace(placeholder, value)
+        # Fill placeholder slots in a single pass
+        parts = list(tokens)
+        for index, placeholder in slots:
+            parts[index] = replacements[placeholder]
 
-        return link
+        return "".join(parts)
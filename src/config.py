@@ -3,22 +3,90 @@
 import logging
 import os
 import re
+from collections.abc import Mapping
 from functools import cached_property
 from pathlib import Path
+from typing import Any, Final
 
 logger = logging.getLogger(__name__)
 
+# Case-insensitive values accepted as true by get_bool
+_TRUTHY_VALUES: Final[frozenset[str]] = frozenset({"true", "yes", "1", "on"})
+
+# One KEY=VALUE assignment per line; surrounding horizontal whitespace is ignored
+_ENV_LINE_PATTERN = re.compile(
+    r"^[^\S\n]*([A-Za-z_][A-Za-z0-9_]*)[^\S\n]*=[^\S\n]*(.*?)[^\S\n]*$", re.MULTILINE
+)
+
+
+def parse_custom_headers(env: Mapping[str, str]) -> list[dict[str, Any]]:
+    """Parse CUSTOM_HEADER_* entries from an environment mapping.
+
+    Format: CUSTOM_HEADER_<N>=header_name|header_value[|user_agent_regex]
+
+    Args:
+        env: Environment variables to scan
+
+    Returns:
+        List of dictionaries with name, value, user_agent_regex and
+        user_agent_re (compiled regex or None) keys
+    """
+    headers: list[dict[str, Any]] = []
+
+    # Collect all CUSTOM_HEADER_* environment variables
+    for key, value in env.items():
+        if not key.startswith("CUSTOM_HEADER_"):
+            continue
+
+        # Parse header configuration: header_name|header_value[|user_agent_regex]
+        parts = value.split("|", 2)  # Split into max 3 parts
+        if len(parts) < 2:
+            logger.warning(f"Invalid custom header format in {key}: {value}")
+            continue
+
+        header_name = parts[0].strip()
+        header_value = parts[1].strip()
+        user_agent_regex = parts[2].strip() if len(parts) > 2 else None
+        user_agent_re = None
+
+        if not header_name or not header_value:
+            logger.warning(f"Empty header name or value in {key}: {value}")
+            continue
+
+        # Validate regex if provided
+        if user_agent_regex:
+            try:
+                user_agent_re = re.compile(user_agent_regex)
+            except re.error as e:
+                logger.error(f"Invalid regex in {key}: {user_agent_regex} - {e}")
+                continue
+
+        headers.append(
+            {
+                "name": header_name,
+                "value": header_value,
+                "user_agent_regex": user_agent_regex,
+                "user_agent_re": user_agent_re,
+            }
+        )
+
+    return headers
+
 
 class EnvConfig:
     """Environment configuration loader with validation.
 
     Loads configuration from environment variables with sensible defaults.
-    Supports both .env files and system environment variables.
+    Supports both .env files and system environment variables. The
+    environment is snapshotted at construction and settings are cached for
+    the process lifetime; call ``invalidate`` after changing the environment
+    to pick up new values.
     """
 
     def __init__(self) -> None:
         """Initialize configuration from environment."""
         self._load_env_file()
+        self._env = self._snapshot_env()
 
     def _load_env_file(self) -> None:
         """Load .env file if it exists."""
@@ -28,29 +96,35 @@ class EnvConfig:
             return
 
         try:
-            with env_file.open("r", encoding="utf-8") as f:
-                for _line_num, line in enumerate(f, 1):
-                    line = line.strip()
-
-                    # Skip empty lines and comments
-                    if not line or line.startswith("#"):
-                        continue
-
-                    # Parse KEY=VALUE
-                    if "=" in line:
-                        key, value = line.split("=", 1)
-                        key = key.strip()
-                        value = value.strip()
+            text = env_file.read_text(encoding="utf-8")
 
-                        # Don't override existing env vars
-                        if key and key not in os.environ:
-                            os.environ[key] = value
+            # Comments and blank lines never match the KEY=VALUE pattern
+            for match in _ENV_LINE_PATTERN.finditer(text):
+                # Don't override existing env vars
+                os.environ.setdefault(match.group(1), match.group(2))
 
         except OSError as e:
             logger.warning(f"Failed to load .env file: {e}")
         except Exception as e:
             logger.error(f"Unexpected error loading .env file: {e}", exc_info=True)
 
+    @staticmethod
+    def _snapshot_env() -> dict[str, str]:
+        """Copy the process environment into a plain dict.
+
+        Lookups on ``os.environ`` go through its key/value encoding wrappers;
+        a plain dict makes every setting read a single C-level ``dict.get``.
+
+        Returns:
+            Snapshot of environment variables
+        """
+        return dict(os.environ)
+
+    def invalidate(self) -> None:
+        """Drop cached settings so they are re-read from the environment."""
+        self.__dict__.clear()
+        self._env = self._snapshot_env()
+
     def get_str(self, key: str, default: str = "") -> str:
         """Get string value from environment.
 
@@ -61,7 +135,7 @@ class EnvConfig:
         Returns:
             String value
         """
-        return os.environ.get(key, default)
+        return self._env.get(key, default)
 
     def get_int(self, key: str, default: int = 0) -> int:
         """Get integer value from environment.
@@ -73,7 +147,7 @@ class EnvConfig:
         Returns:
             Integer value
         """
-        value = os.environ.get(key)
+        value = self._env.get(key)
         if value is None:
             return default
 
@@ -92,11 +166,12 @@ class EnvConfig:
         Returns:
             Boolean value
         """
-        value = os.environ.get(key)
+        value = self._env.get(key)
         if value is None:
             return default
 
-        return value.lower() in ("true", "yes", "1", "on")
+        # Exact lowercase spellings skip the lower() copy
+        return value in _TRUTHY_VALUES or value.lower() in _TRUTHY_VALUES
 
     def get_path(self, key: str, default: Path | None = None) -> Path | None:
         """Get path value from environment.
@@ -108,7 +183,7 @@ class EnvConfig:
         Returns:
             Path object or None
         """
-        value = os.environ.get(key)
+        value = self._env.get(key)
         if value is None:
             return default
 
@@ -148,10 +223,10 @@ class EnvConfig:
         3. New default path
         4. Legacy default path when new default does not exist
         """
-        if key in os.environ:
+        if key in self._env:
             return self.resolve_path(key, default, base_dir)
 
-        if legacy_key and legacy_key in os.environ:
+        if legacy_key and legacy_key in self._env:
             return self.resolve_path(legacy_key, legacy_default or default, base_dir)
 
         resolved_default = self.resolve_path(key, default, base_dir)
@@ -174,7 +249,7 @@ class EnvConfig:
         Returns:
             List of strings
         """
-        value = os.environ.get(key)
+        value = self._env.get(key)
         if value is None:
             return default or []
 
@@ -204,7 +279,7 @@ class EnvConfig:
             return None
 
     # Security settings
-    @property
+    @cached_property
     def secret_path(self) -> str:
         """Get secret API path."""
         value = self.get_str("SECRET_PATH")
@@ -213,29 +288,29 @@ class EnvConfig:
         return value
 
     # Server settings
-    @property
+    @cached_property
     def socket_path(self) -> str | None:
         """Get Unix socket path for production."""
         value = self.get_str("SOCK")
         return value if value else None
 
-    @property
+    @cached_property
     def dev_host(self) -> str:
         """Get development server host."""
         return self.get_str("DEV_HOST", "127.0.0.1")
 
-    @property
+    @cached_property
     def dev_port(self) -> int:
         """Get development server port."""
         return self.get_int("DEV_PORT", 5000)
 
-    @property
+    @cached_property
     def dev_debug(self) -> bool:
         """Get development debug mode."""
         return self.get_bool("DEV_DEBUG", True)
 
     # Path settings
-    @property
+    @cached_property
     def base_dir(self) -> Path:
         """Get base directory."""
         custom_path = self.get_path("BASE_DIR")
@@ -243,22 +318,22 @@ class EnvConfig:
             return custom_path
         return Path(__file__).parent.parent
 
-    @property
+    @cached_property
     def cache_dir(self) -> Path:
         """Get cache directory."""
         return self.resolve_path("SUBSTUB_CACHE_DIR", "/var/cache/sub-stub")
 
-    @property
+    @cached_property
     def servers_file(self) -> Path:
         """Get servers file path (unified format)."""
         return self.resolve_path("SERVERS_FILE", "servers")
 
-    @property
+    @cached_property
     def users_file(self) -> Path:
         """Get users file path."""
         return self.resolve_path("USERS_FILE", "users")
 
-    @property
+    @cached_property
     def v2ray_profile_file(self) -> Path:
         """Get V2Ray subscription base file path."""
         return self.resolve_profile_path(
@@ -268,7 +343,7 @@ class EnvConfig:
             legacy_default="templates/v2ray-url-template.txt",
         )
 
-    @property
+    @cached_property
     def xray_profile_file(self) -> Path:
         """Get Xray JSON base file path."""
         return self.resolve_profile_path(
@@ -277,7 +352,7 @@ class EnvConfig:
             legacy_default="templates/v2ray-template.json",
         )
 
-    @property
+    @cached_property
     def mihomo_profile_file(self) -> Path:
         """Get Mihomo base file path."""
         return self.resolve_profile_path(
@@ -286,29 +361,29 @@ class EnvConfig:
             legacy_default="templates/mihomo-template.yaml",
         )
 
-    @property
+    @cached_property
     def template_file(self) -> Path:
         """Legacy alias for V2Ray subscription base file path."""
         return self.v2ray_profile_file
 
-    @property
+    @cached_property
     def happ_routing_file(self) -> Path:
         """Get Happ routing file path."""
         return self.resolve_path("HAPP_ROUTING_FILE", "happ.routing")
 
-    @property
+    @cached_property
     def incy_routing_file(self) -> Path:
         """Get Incy routing file path."""
         return self.resolve_path("INCY_ROUTING_FILE", "incy.routing")
 
     # Cache settings
-    @property
+    @cached_property
     def geo_cache_ttl(self) -> int:
         """Get geo cache TTL in seconds."""
         return self.get_int("GEO_CACHE_TTL", 600)
 
     # Geo files settings
-    @property
+    @cached_property
     def geo_files_urls(self) -> list[str]:
         """Get geo files URLs."""
         urls = self.get_list("GEO_FILES_URLS")
@@ -322,37 +397,42 @@ class EnvConfig:
         ]
 
     # Logging settings
-    @property
+    @cached_property
     def log_level(self) -> str:
         """Get log level."""
         return self.get_str("LOG_LEVEL", "INFO").upper()
 
-    @property
+    @cached_property
     def log_format(self) -> str:
         """Get log format."""
         return self.get_str("LOG_FORMAT", "%(asctime)s - %(name)s - %(levelname)s - %(message)s")
 
     # Advanced settings
-    @property
+    @cached_property
     def spiderx_min_length(self) -> int:
         """Get minimum Spider-X path length."""
         return self.get_int("SPIDERX_MIN_LENGTH", 10)
 
-    @property
+    @cached_property
     def spiderx_max_length(self) -> int:
         """Get maximum Spider-X path length."""
         return self.get_int("SPIDERX_MAX_LENGTH", 24)
 
-    @property
+    @cached_property
     def flask_json_sort_keys(self) -> bool:
         """Get Flask JSON sort keys setting."""
         return self.get_bool("FLASK_JSON_SORT_KEYS", False)
 
-    @property
+    @cached_property
     def worker_threads(self) -> int:
         """Get number of worker threads."""
         return self.get_int("WORKER_THREADS", 1)
 
+    @cached_property
+    def connection_limit(self) -> int:
+        """Get maximum number of simultaneous connections accepted by the server."""
+        return self.get_int("CONNECTION_LIMIT", 100)
+
     # User-Agent policy settings
     @cached_property
     def subscription_user_agent_whitelist_pattern(self) -> re.Pattern[str] | None:
@@ -382,7 +462,7 @@ class EnvConfig:
         )
 
     @cached_property
-    def custom_headers(self) -> list[dict[str, str]]:
+    def custom_headers(self) -> list[dict[str, Any]]:
         """Get custom headers configuration.
 
         Parses all CUSTOM_HEADER_* environment variables.
@@ -397,46 +477,7 @@ class EnvConfig:
             - user_agent_regex: Optional regex pattern for User-Agent filtering
             - user_agent_re: Optional compiled regex pattern
         """
-        headers = []
-
-        # Collect all CUSTOM_HEADER_* environment variables
-        for key, value in os.environ.items():
-            if not key.startswith("CUSTOM_HEADER_"):
-                continue
-
-            # Parse header configuration: header_name|header_value[|user_agent_regex]
-            parts = value.split("|", 2)  # Split into max 3 parts
-            if len(parts) < 2:
-                logger.warning(f"Invalid custom header format in {key}: {value}")
-                continue
-
-            header_name = parts[0].strip()
-            header_value = parts[1].strip()
-            user_agent_regex = parts[2].strip() if len(parts) > 2 else None
-            user_agent_re = None
-
-            if not header_name or not header_value:
-                logger.warning(f"Empty header name or value in {key}: {value}")
-                continue
-
-            # Validate regex if provided
-            if user_agent_regex:
-                try:
-                    user_agent_re = re.compile(user_agent_regex)
-                except re.error as e:
-                    logger.error(f"Invalid regex in {key}: {user_agent_regex} - {e}")
-                    continue
-
-            headers.append(
-                {
-                    "name": header_name,
-                    "value": header_value,
-                    "user_agent_regex": user_agent_regex,
-                    "user_agent_re": user_agent_re,
-                }
-            )
-
-        return headers
+        return parse_custom_headers(self._env)
 
 
 # Global configuration instance
@@ -33,7 +33,6 @@ GEO_FILES_URLS: Final[list[str]] = env_config.geo_files_urls
 # Spider-X generation parameters (from environment)
 SPIDERX_MIN_LENGTH: Final[int] = env_config.spiderx_min_length
 SPIDERX_MAX_LENGTH: Final[int] = env_config.spiderx_max_length
-SPIDERX_CANDIDATES: Final[list[int]] = [8, 10, 12, 16, 18]
 SPIDERX_MAX_ATTEMPTS: Final[int] = 8
 
 # Response MIME types
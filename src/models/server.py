@@ -1,9 +1,10 @@
 """Server model definitions."""
 
-from dataclasses import dataclass
+import urllib.parse
+from dataclasses import dataclass, field
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Server:
     """Represents a VPN/Proxy server configuration.
 
@@ -17,6 +18,8 @@ class Server:
         fixed_short_id: Fixed short ID for external servers
         is_external: Whether this is an external (shared) server
         groups: Set of group names this server belongs to
+        encoded_server_name: URL-encoded server name for subscription links
+        encoded_description: URL-encoded description for subscription links
     """
 
     host: str
@@ -28,6 +31,18 @@ class Server:
     fixed_short_id: str | None = None
     is_external: bool = False
     groups: frozenset[str] = frozenset()
+    encoded_server_name: str = field(init=False, repr=False, compare=False)
+    encoded_description: str = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        """Compute URL-encoded fields once per server."""
+        # Slotted classes have no __dict__ for cached_property, so encode eagerly
+        object.__setattr__(
+            self, "encoded_server_name", urllib.parse.quote(self.server_name, safe="")
+        )
+        object.__setattr__(
+            self, "encoded_description", urllib.parse.quote(self.description, safe="")
+        )
 
     def is_in_group(self, group: str) -> bool:
         """Check if server belongs to a specific group.
@@ -3,7 +3,7 @@
 from dataclasses import dataclass
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class UserInfo:
     """Represents a user with their VPN/Proxy credentials.
 
@@ -59,8 +59,6 @@ class UserInfo:
         # If server has no groups, it's available to everyone
         if not server_groups:
             return True
-        # If user has no groups, they can't access group-restricted servers
-        if not self.groups:
-            return False
-        # Check for intersection
-        return bool(self.groups & server_groups)
+        # Check for a shared group without building the intersection set;
+        # a user with no groups can't access group-restricted servers
+        return not self.groups.isdisjoint(server_groups)
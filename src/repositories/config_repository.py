@@ -2,6 +2,7 @@
 
 import json
 import logging
+import threading
 from pathlib import Path
 from typing import Any
 
@@ -9,6 +10,11 @@ import yaml
 
 from .base import BaseRepository
 
+try:
+    from yaml import CSafeLoader as YamlLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader as YamlLoader
+
 logger = logging.getLogger(__name__)
 
 
@@ -24,9 +30,8 @@ class JsonConfigRepository(BaseRepository[list[dict[str, Any]]]):
         Returns:
             List of configuration dictionaries
         """
-        with path.open("r", encoding="utf-8") as file:
-            data = json.load(file)
-            return data if isinstance(data, list) else []
+        data = json.loads(path.read_bytes())
+        return data if isinstance(data, list) else []
 
     def _get_default(self) -> list[dict[str, Any]]:
         """Return empty list if file doesn't exist.
@@ -49,9 +54,9 @@ class YamlConfigRepository(BaseRepository[dict[str, Any]]):
         Returns:
             Configuration dictionary
         """
-        with path.open("r", encoding="utf-8") as file:
-            data = yaml.safe_load(file)
-            return data if isinstance(data, dict) else {}
+        # Parse the whole buffer with libyaml when PyYAML was built with it
+        data = yaml.load(path.read_bytes(), Loader=YamlLoader)
+        return data if isinstance(data, dict) else {}
 
     def _get_default(self) -> dict[str, Any]:
         """Return empty dict if file doesn't exist.
@@ -74,8 +79,12 @@ class TextConfigRepository(BaseRepository[str]):
         Returns:
             File content as string
         """
-        with path.open("r", encoding="utf-8") as file:
-            return file.read().strip()
+        # Decode the raw bytes directly instead of going through a text-mode stream
+        text = path.read_bytes().decode("utf-8")
+        if "\r" in text:
+            # Keep the newline translation text mode used to apply
+            text = text.replace("\r\n", "\n").replace("\r", "\n")
+        return text.strip()
 
     def _get_default(self) -> str:
         """Return empty string if file doesn't exist.
@@ -119,12 +128,18 @@ class ConfigRepository:
             xray_profile_path: self.xray_profile,
             mihomo_profile_path: self.mihomo_profile,
         }
+        # Variant listings keyed by base profile, tagged with the directory's
+        # (mtime_ns, size); the lock only serializes rescans, like FileCache
+        self._profile_variants: dict[
+            Path, tuple[tuple[int, int], tuple[tuple[Path, tuple[str, ...]], ...]]
+        ] = {}
+        self._profile_variants_lock = threading.Lock()
 
     def get_all_servers(self):
         """Get all servers from unified configuration.
 
         Returns:
-            List of all servers
+            Tuple of all servers
         """
         return self.servers.get()
 
@@ -199,21 +214,8 @@ class ConfigRepository:
         if not normalized_ua:
             return base_path
 
-        prefix = f"{base_path.stem}_"
-
-        try:
-            candidates = sorted(base_path.parent.iterdir(), key=lambda path: path.name)
-        except FileNotFoundError:
-            return base_path
-
         matches: list[tuple[int, int, int, str, Path]] = []
-        for path in candidates:
-            if not path.is_file() or path.suffix != base_path.suffix:
-                continue
-            if not path.stem.startswith(prefix):
-                continue
-
-            keywords = self._extract_profile_keywords(path, base_path.stem)
+        for path, keywords in self._get_profile_variants(base_path):
             matched_scores = [
                 (normalized_ua.find(keyword), -len(keyword))
                 for keyword in keywords
@@ -227,6 +229,71 @@ class ConfigRepository:
 
         return min(matches)[4] if matches else base_path
 
+    def _get_profile_variants(self, base_path: Path) -> tuple[tuple[Path, tuple[str, ...]], ...]:
+        """Get keyword variants of a base profile.
+
+        The directory listing is cached by the directory's modification time and
+        size, so requests only rescan it when profile files are added, removed
+        or renamed. Cache hits are served without taking the lock.
+
+        Args:
+            base_path: Base profile path
+
+        Returns:
+            Tuple of (variant path, keywords) pairs sorted by filename
+        """
+        directory = base_path.parent
+        try:
+            stat = directory.stat()
+        except FileNotFoundError:
+            return ()
+        cache_key = (stat.st_mtime_ns, stat.st_size)
+
+        # Fast path: entries are replaced whole, so a lock-free read is safe
+        cached = self._profile_variants.get(base_path)
+        if cached is not None and cached[0] == cache_key:
+            return cached[1]
+
+        with self._profile_variants_lock:
+            # Another thread may have rescanned the directory while we waited
+            cached = self._profile_variants.get(base_path)
+            if cached is not None and cached[0] == cache_key:
+                return cached[1]
+
+            result = self._scan_profile_variants(base_path)
+            self._profile_variants[base_path] = (cache_key, result)
+            return result
+
+    def _scan_profile_variants(self, base_path: Path) -> tuple[tuple[Path, tuple[str, ...]], ...]:
+        """List keyword variants of a base profile from its directory.
+
+        Args:
+            base_path: Base profile path
+
+        Returns:
+            Tuple of (variant path, keywords) pairs sorted by filename
+        """
+        directory = base_path.parent
+        prefix = f"{base_path.stem}_"
+        variants: list[tuple[Path, tuple[str, ...]]] = []
+
+        try:
+            candidates = sorted(directory.iterdir(), key=lambda path: path.name)
+        except FileNotFoundError:
+            return ()
+
+        for path in candidates:
+            if not path.is_file() or path.suffix != base_path.suffix:
+                continue
+            if not path.stem.startswith(prefix):
+                continue
+
+            keywords = self._extract_profile_keywords(path, base_path.stem)
+            if keywords:
+                variants.append((path, keywords))
+
+        return tuple(variants)
+
     def _extract_profile_keywords(self, path: Path, base_name: str) -> tuple[str, ...]:
         """Extract OR-matched keywords from profile filename."""
         stem = path.stem
@@ -1,5 +1,7 @@
 """Server repository for managing server configurations."""
 
+import sys
+from functools import lru_cache
 from pathlib import Path
 
 from ..models import Server
@@ -7,9 +9,12 @@ from ..utils import decode_unicode_escapes
 from .base import BaseRepository
 
 
+@lru_cache(maxsize=1024)
 def _parse_groups(groups_str: str | None) -> frozenset[str]:
     """Parse comma-separated list of groups.
 
+    Results are memoized so servers with the same group list share one set.
+
     Args:
         groups_str: Comma-separated group list
 
@@ -19,11 +24,11 @@ def _parse_groups(groups_str: str | None) -> frozenset[str]:
     if not groups_str or not groups_str.strip():
         return frozenset()
 
-    groups = [g.strip() for g in groups_str.split(",")]
-    return frozenset(g for g in groups if g)
+    # Strip and filter in one pass over the split tokens
+    return frozenset(sys.intern(group) for raw in groups_str.split(",") if (group := raw.strip()))
 
 
-class ServerRepository(BaseRepository[list[Server]]):
+class ServerRepository(BaseRepository[tuple[Server, ...]]):
     """Repository for loading server configurations.
 
     File format: host|sni|dns|public_key|description|groups|type|uuid|short_id
@@ -37,30 +42,24 @@ class ServerRepository(BaseRepository[list[Server]]):
         """
         super().__init__(file_path)
 
-    def _load_from_file(self, path: Path) -> list[Server]:
+    def _load_from_file(self, path: Path) -> tuple[Server, ...]:
         """Load servers from configuration file.
 
         Args:
             path: File path to load from
 
         Returns:
-            List of Server objects
+            Tuple of Server objects, safe to share between requests
         """
-        servers: list[Server] = []
-
-        with path.open("r", encoding="utf-8") as file:
-            for line in file:
-                stripped = line.strip()
-
-                # Skip empty lines and comments
-                if not stripped or stripped.startswith("#"):
-                    continue
-
-                server = self._parse_line(stripped)
-                if server:
-                    servers.append(server)
-
-        return servers
+        # Read once and skip blank and comment lines before decoding them;
+        # _parse_line strips every field, so lines are stripped only once here
+        lines = (raw_line.strip() for raw_line in path.read_bytes().splitlines())
+        return tuple(
+            server
+            for line in lines
+            if line and not line.startswith(b"#")
+            if (server := self._parse_line(line.decode("utf-8")))
+        )
 
     def _parse_line(self, line: str) -> Server | None:
         """Parse new pipe-separated format.
@@ -73,27 +72,42 @@ class ServerRepository(BaseRepository[list[Server]]):
         Returns:
             Server object or None if invalid
         """
-        parts = [p.strip() for p in line.split("|", 8)]
+        parts = line.split("|", 8)
 
         if len(parts) < 5:
             return None
 
-        host = parts[0]
-        sni = parts[1] if len(parts) > 1 else None
-        dns = parts[2] if len(parts) > 2 else None
-        public_key = parts[3] if len(parts) > 3 else None
-        description = parts[4] if len(parts) > 4 else host
-        groups_str = parts[5] if len(parts) > 5 else None
-        server_type = parts[6].lower() if len(parts) > 6 and parts[6] else "internal"
-        fixed_id = parts[7] if len(parts) > 7 and parts[7] else None
-        fixed_short_id = parts[8] if len(parts) > 8 and parts[8] else None
+        # Pad optional trailing fields so the line unpacks in one step
+        parts += [""] * (9 - len(parts))
+        (
+            host,
+            sni,
+            dns,
+            public_key,
+            description,
+            groups_str,
+            server_type,
+            fixed_id,
+            fixed_short_id,
+        ) = map(str.strip, parts)
+
+        server_type = server_type.lower() or "internal"
+        fixed_id = fixed_id or None
+        fixed_short_id = fixed_short_id or None
 
         if not host:
             return None
 
-        # Decode unicode escapes in description and sni
-        description = decode_unicode_escapes(description) if description else host
-        sni = decode_unicode_escapes(sni) if sni else None
+        # Decode unicode escapes in description and sni; most lines have none,
+        # so only call the decoder when a backslash is present
+        if not description:
+            description = host
+        elif "\\" in description:
+            description = decode_unicode_escapes(description)
+        if not sni:
+            sni = None
+        elif "\\" in sni:
+            sni = decode_unicode_escapes(sni)
 
         # Parse groups
         groups = _parse_groups(groups_str)
@@ -113,10 +127,10 @@ class ServerRepository(BaseRepository[list[Server]]):
             groups=groups,
         )
 
-    def _get_default(self) -> list[Server]:
-        """Return empty list if file doesn't exist.
+    def _get_default(self) -> tuple[Server, ...]:
+        """Return empty tuple if file doesn't exist.
 
         Returns:
-            Empty server list
+            Empty server tuple
         """
-        return []
+        return ()
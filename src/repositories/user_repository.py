@@ -1,8 +1,14 @@
 """User repository for managing user credentials."""
 
 import logging
+import re
+import sys
 import uuid
+from collections.abc import Mapping
+from functools import lru_cache
 from pathlib import Path
+from types import MappingProxyType
+from typing import Final
 
 from ..models import UserInfo
 from .base import BaseRepository
@@ -10,9 +16,21 @@ from .base import BaseRepository
 logger = logging.getLogger(__name__)
 
 
+# Canonical hyphenated UUID, checked without building a uuid.UUID object
+_UUID_PATTERN: Final[re.Pattern[str]] = re.compile(
+    r"[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}\Z"
+)
+
+# Shared group set for users without explicit groups
+_DEFAULT_GROUPS: Final[frozenset[str]] = frozenset(["default"])
+
+
+@lru_cache(maxsize=1024)
 def _parse_groups(groups_str: str | None) -> frozenset[str]:
     """Parse comma-separated list of groups.
 
+    Results are memoized so users with the same group list share one set.
+
     Args:
         groups_str: Comma-separated group list
 
@@ -20,49 +38,59 @@ def _parse_groups(groups_str: str | None) -> frozenset[str]:
         Frozenset of group names, defaults to {"default"} if empty
     """
     if not groups_str or not groups_str.strip():
-        return frozenset(["default"])
+        return _DEFAULT_GROUPS
 
-    groups = [g.strip() for g in groups_str.split(",")]
-    result = frozenset(g for g in groups if g)
+    # Strip and filter in one pass over the split tokens
+    result = frozenset(sys.intern(group) for raw in groups_str.split(",") if (group := raw.strip()))
 
-    return result if result else frozenset(["default"])
+    return result if result else _DEFAULT_GROUPS
 
 
-class UserRepository(BaseRepository[dict[str, UserInfo]]):
+class UserRepository(BaseRepository[Mapping[str, UserInfo]]):
     """Repository for loading user credentials.
 
     File format: uuid|short_id|link_path|comment|groups|mihomo_advanced (pipe-separated)
     """
 
-    def _load_from_file(self, path: Path) -> dict[str, UserInfo]:
+    def __init__(self, file_path: Path) -> None:
+        """Initialize user repository.
+
+        Args:
+            file_path: Path to users configuration file
+        """
+        super().__init__(file_path)
+        self._key_lengths: tuple[Mapping[str, UserInfo], tuple[int, ...]] | None = None
+
+    def _load_from_file(self, path: Path) -> Mapping[str, UserInfo]:
         """Load users from configuration file.
 
         Args:
             path: File path to load from
 
         Returns:
-            Dictionary mapping link paths to UserInfo objects
+            Read-only mapping of link paths to UserInfo objects
         """
         users: dict[str, UserInfo] = {}
 
-        with path.open("r", encoding="utf-8") as file:
-            for line_num, line in enumerate(file, 1):
-                stripped = line.strip()
+        # Read once and skip blank and comment lines before decoding them
+        for line_num, raw_line in enumerate(path.read_bytes().splitlines(), 1):
+            raw_line = raw_line.strip()
 
-                # Skip empty lines and comments
-                if not stripped or stripped.startswith("#"):
-                    continue
+            # Skip empty lines and comments
+            if not raw_line or raw_line.startswith(b"#"):
+                continue
 
-                try:
-                    user = self._parse_line(stripped)
-                    if user:
-                        key, info = user
-                        users[key] = info
-                except (ValueError, IndexError) as e:
-                    logger.warning(f"Failed to parse user line {line_num}: {e}")
-                    continue
+            try:
+                user = self._parse_line(raw_line.decode("utf-8"))
+                if user:
+                    key, info = user
+                    users[key] = info
+            except (ValueError, IndexError) as e:
+                logger.warning(f"Failed to parse user line {line_num}: {e}")
+                continue
 
-        return users
+        # The cached mapping is shared by all requests, so hand out a read-only view
+        return MappingProxyType(users)
 
     def _parse_line(self, line: str) -> tuple[str, UserInfo] | None:
         """Parse pipe-separated format.
@@ -75,27 +103,27 @@ class UserRepository(BaseRepository[dict[str, UserInfo]]):
         Returns:
             Tuple of (link_path, UserInfo) or None if invalid
         """
-        parts = [p.strip() for p in line.split("|", 5)]
+        parts = line.split("|", 5)
 
         if len(parts) < 3:
             return None
 
-        user_id = parts[0]
-        short_id = parts[1] if len(parts) > 1 else None
-        link_path = parts[2] if len(parts) > 2 else None
-        comment = parts[3] if len(parts) > 3 else ""
-        groups_str = parts[4] if len(parts) > 4 else None
-        mihomo_advanced = parts[5] if len(parts) > 5 and parts[5] else None
+        # Pad optional trailing fields so the line unpacks in one step
+        parts += [""] * (6 - len(parts))
+        user_id, short_id, link_path, comment, groups_str, mihomo_advanced = map(str.strip, parts)
+        mihomo_advanced = mihomo_advanced or None
 
         if not user_id or not link_path:
             return None
 
-        # Validate UUID format
-        try:
-            uuid.UUID(user_id)
-        except ValueError:
-            logger.warning(f"Invalid UUID format for user '{link_path}': {user_id}")
-            return None
+        # Validate UUID format; the regex covers the canonical form, and
+        # uuid.UUID still accepts the other spellings it always allowed
+        if not _UUID_PATTERN.match(user_id):
+            try:
+                uuid.UUID(user_id)
+            except ValueError:
+                logger.warning(f"Invalid UUID format for user '{link_path}': {user_id}")
+                return None
 
         groups = _parse_groups(groups_str)
 
@@ -109,13 +137,13 @@ class UserRepository(BaseRepository[dict[str, UserInfo]]):
             mihomo_advanced=mihomo_advanced,
         )
 
-    def _get_default(self) -> dict[str, UserInfo]:
-        """Return empty dict if file doesn't exist.
+    def _get_default(self) -> Mapping[str, UserInfo]:
+        """Return empty mapping if file doesn't exist.
 
         Returns:
-            Empty user dictionary
+            Empty user mapping
         """
-        return {}
+        return MappingProxyType({})
 
     def find_by_prefix(self, prefix: str) -> UserInfo | None:
         """Find user by longest matching key prefix.
@@ -133,7 +161,36 @@ class UserRepository(BaseRepository[dict[str, UserInfo]]):
         if not users:
             return None
 
-        # Find the longest key that matches as a prefix
-        matching_key = max((key for key in users if prefix.startswith(key)), key=len, default=None)
+        # An exact match is always the longest matching prefix
+        user = users.get(prefix)
+        if user is not None:
+            return user
+
+        # Try the longest candidate first: one dict lookup per distinct key length
+        for length in self._get_key_lengths(users):
+            if length <= len(prefix):
+                user = users.get(prefix[:length])
+                if user is not None:
+                    return user
+
+        return None
+
+    def _get_key_lengths(self, users: Mapping[str, UserInfo]) -> tuple[int, ...]:
+        """Get distinct user key lengths, longest first.
+
+        The result is cached for the currently loaded users dict and rebuilt
+        when the file cache hands out a new one.
+
+        Args:
+            users: Loaded users mapping
+
+        Returns:
+            Distinct key lengths in descending order
+        """
+        cached = self._key_lengths
+        if cached is not None and cached[0] is users:
+            return cached[1]
 
-        return users.get(matching_key) if matching_key else None
+        lengths = tuple(sorted({len(key) for key in users}, reverse=True))
+        self._key_lengths = (users, lengths)
+        return lengths
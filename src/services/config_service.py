@@ -1,5 +1,7 @@
 """Configuration service for managing builders and repositories."""
 
+from collections.abc import Sequence
+
 from ..builders import LegacyJsonBuilder, MihomoBuilder, V2RayBuilder
 from ..models import AppConfig, Server, UserInfo
 from ..repositories import ConfigRepository
@@ -46,11 +48,11 @@ class ConfigService:
             spiderx_generator=self.spiderx_gen,
         )
 
-    def get_servers(self) -> list[Server]:
+    def get_servers(self) -> tuple[Server, ...]:
         """Get all available servers.
 
         Returns:
-            List of all servers
+            Tuple of all servers
         """
         return self.repos.get_all_servers()
 
@@ -66,7 +68,7 @@ class ConfigService:
         return self.repos.users.find_by_prefix(prefix)
 
     def build_mihomo_config(
-        self, servers: list[Server], user: UserInfo, user_agent: str = ""
+        self, servers: Sequence[Server], user: UserInfo, user_agent: str = ""
     ) -> bytes:
         """Build Mihomo/Clash configuration.
 
@@ -85,7 +87,7 @@ class ConfigService:
         )
 
     def build_v2ray_config(
-        self, servers: list[Server], user: UserInfo, user_agent: str = ""
+        self, servers: Sequence[Server], user: UserInfo, user_agent: str = ""
     ) -> bytes:
         """Build V2Ray subscription.
 
@@ -100,7 +102,7 @@ class ConfigService:
         return self.v2ray_builder.build(servers, user, user_agent=user_agent)
 
     def build_legacy_config(
-        self, servers: list[Server], user: UserInfo, user_agent: str = ""
+        self, servers: Sequence[Server], user: UserInfo, user_agent: str = ""
     ) -> bytes:
         """Build legacy JSON configuration.
 
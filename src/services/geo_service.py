@@ -3,11 +3,14 @@
 import base64
 import json
 import logging
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Any
 
 import requests
+from requests.adapters import HTTPAdapter
 
 from ..constants import GEO_FILES_URLS
 
@@ -31,6 +34,16 @@ class GeoFileService:
         self.cache_dir = cache_dir
         self.cache_ttl = cache_ttl
         self.meta_file = cache_dir / "geofiles_meta.json"
+        # Last known (check time, update timestamp), so fresh reads skip the metadata file
+        self._last_updated: tuple[int, int] | None = None
+        # Last built routing header per scheme: (template, timestamp, header)
+        self._routing_headers: dict[str, tuple[dict[str, Any], int, str]] = {}
+
+        # Only one request thread refreshes the timestamp; the others wait for it
+        self._lock = threading.Lock()
+        # One session per URL: probes run concurrently and requests.Session is
+        # not thread-safe, but each keeps its connection alive between checks
+        self._sessions: dict[str, requests.Session] = {}
 
     def get_last_updated_timestamp(self) -> int:
         """Get timestamp of last geo files update.
@@ -38,17 +51,30 @@ class GeoFileService:
         Returns:
             Unix timestamp of last update
         """
-        metadata = self._load_metadata()
         now = int(time.time())
-        last_check = int(metadata.get("last_check", 0))
-
-        # Return cached value if still fresh
-        if now - last_check < self.cache_ttl and "last_updated" in metadata:
-            return int(metadata.get("last_updated", 0))
-
-        # Check for updates
-        last_updated = self._check_updates(metadata, now)
-        return last_updated
+        cached = self._last_updated
+        if cached is not None and now - cached[0] < self.cache_ttl:
+            return cached[1]
+
+        with self._lock:
+            # Another thread may have refreshed the timestamp while we waited
+            cached = self._last_updated
+            if cached is not None and now - cached[0] < self.cache_ttl:
+                return cached[1]
+
+            metadata = self._load_metadata()
+            last_check = int(metadata.get("last_check", 0))
+
+            # Return cached value if still fresh
+            if now - last_check < self.cache_ttl and "last_updated" in metadata:
+                last_updated = int(metadata.get("last_updated", 0))
+                self._last_updated = (last_check, last_updated)
+                return last_updated
+
+            # Check for updates
+            last_updated = self._check_updates(metadata, now)
+            self._last_updated = (now, last_updated)
+            return last_updated
 
     def build_routing_header(self, routing_template: dict[str, Any], scheme: str = "happ") -> str:
         """Build routing header value for Happ/Incy clients.
@@ -60,20 +86,30 @@ class GeoFileService:
         Returns:
             Base64-encoded routing header value
         """
-        template = routing_template.copy()
         timestamp = self.get_last_updated_timestamp()
 
+        # Templates are loaded once and only the timestamp varies, so reuse the
+        # last header until either changes
+        cached = self._routing_headers.get(scheme)
+        if cached is not None and cached[0] is routing_template and cached[1] == timestamp:
+            return cached[2]
+
+        template = routing_template.copy()
+
         # Add timestamp to template
         template["LastUpdated"] = str(timestamp) if timestamp > 0 else ""
 
         try:
             json_str = json.dumps(template, ensure_ascii=False, separators=(",", ":"))
             b64 = base64.b64encode(json_str.encode("utf-8")).decode("ascii")
-            return f"{scheme}://routing/onadd/{b64}"
+            header = f"{scheme}://routing/onadd/{b64}"
         except (TypeError, UnicodeEncodeError, ValueError) as e:
             logger.warning(f"Failed to build routing header: {e}")
             return ""
 
+        self._routing_headers[scheme] = (routing_template, timestamp, header)
+        return header
+
     def _load_metadata(self) -> dict[str, Any]:
         """Load metadata from cache file.
 
@@ -81,9 +117,8 @@ class GeoFileService:
             Metadata dictionary
         """
         try:
-            with self.meta_file.open("r", encoding="utf-8") as f:
-                data = json.load(f)
-                return data if isinstance(data, dict) else {}
+            data = json.loads(self.meta_file.read_bytes())
+            return data if isinstance(data, dict) else {}
         except FileNotFoundError:
             return {}
         except json.JSONDecodeError as e:
@@ -102,26 +137,39 @@ class GeoFileService:
         try:
             self.cache_dir.mkdir(parents=True, exist_ok=True)
 
+            # Compact output goes through the C encoder in one call
             tmp_file = self.meta_file.with_suffix(self.meta_file.suffix + ".tmp")
-            with tmp_file.open("w", encoding="utf-8") as f:
-                json.dump(metadata, f, ensure_ascii=False, indent=2)
-
-            # Safe file replacement (atomic on POSIX, best-effort on Windows)
-            if self.meta_file.exists():
-                try:
-                    tmp_file.replace(self.meta_file)
-                except OSError:
-                    # On Windows, replace may fail if file is open
-                    self.meta_file.unlink()
-                    tmp_file.rename(self.meta_file)
-            else:
-                tmp_file.rename(self.meta_file)
+            tmp_file.write_bytes(json.dumps(metadata, ensure_ascii=False).encode("utf-8"))
+
+            # os.replace overwrites atomically on both POSIX and Windows
+            tmp_file.replace(self.meta_file)
         except OSError as e:
             logger.warning(f"Failed to save metadata: {e}")
 
+    def _get_session(self, url: str) -> requests.Session:
+        """Get the session used to probe a URL, creating it on first use.
+
+        Must be called with the lock held.
+
+        Args:
+            url: URL the session is for
+
+        Returns:
+            Requests session owned by this URL's probes
+        """
+        session = self._sessions.get(url)
+        if session is None:
+            session = requests.Session()
+            session.headers.update({"User-Agent": "happ-routing/1.0"})
+            session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=1))
+            self._sessions[url] = session
+        return session
+
     def _check_updates(self, metadata: dict[str, Any], now: int) -> int:
         """Check for geo files updates.
 
+        Must be called with the lock held.
+
         Args:
             metadata: Current metadata
             now: Current timestamp
@@ -133,16 +181,23 @@ class GeoFileService:
         raw_url_metadata = metadata.get("urls")
         url_metadata = raw_url_metadata if isinstance(raw_url_metadata, dict) else {}
 
-        with requests.Session() as session:
-            session.headers.update({"User-Agent": "happ-routing/1.0"})
-
-            # Check each geo file URL
-            for url in GEO_FILES_URLS:
-                url_meta = url_metadata.get(url)
-                if not isinstance(url_meta, dict):
-                    url_meta = {}
-
-                timestamp = self._check_url(session, url, url_meta, now)
+        url_metas: dict[str, dict[str, Any]] = {}
+        for url in GEO_FILES_URLS:
+            url_meta = url_metadata.get(url)
+            url_metas[url] = url_meta if isinstance(url_meta, dict) else {}
+
+        # Probe all URLs concurrently; each probe only touches its own session
+        # and url_meta
+        sessions = [self._get_session(url) for url in url_metas]
+        with ThreadPoolExecutor(
+            max_workers=max(len(url_metas), 1), thread_name_prefix="geo-check"
+        ) as executor:
+            timestamps = executor.map(
+                lambda session, item: self._check_url(session, item[0], item[1], now),
+                sessions,
+                url_metas.items(),
+            )
+            for (url, url_meta), timestamp in zip(url_metas.items(), timestamps, strict=True):
                 max_timestamp = max(max_timestamp, timestamp)
                 url_meta["last_ts"] = timestamp
                 url_metadata[url] = url_meta
@@ -160,6 +215,9 @@ class GeoFileService:
     ) -> int:
         """Check a single URL for updates.
 
+        Sends a conditional HEAD request, falling back to a one-byte ranged
+        GET for servers that do not allow HEAD, so no file body is downloaded.
+
         Args:
             session: Requests session
             url: URL to check
@@ -170,32 +228,49 @@ class GeoFileService:
             Timestamp for this URL
         """
         prev_etag = url_meta.get("etag")
+        prev_last_modified = url_meta.get("last_modified")
         prev_ts = int(url_meta.get("last_ts", 0))
 
         headers = {}
         if prev_etag:
             headers["If-None-Match"] = prev_etag
+        if prev_last_modified:
+            headers["If-Modified-Since"] = prev_last_modified
 
         try:
-            with session.get(url, headers=headers, timeout=15, stream=True) as response:
+            response = session.head(url, headers=headers, timeout=15, allow_redirects=True)
+            if response.status_code in (405, 501):
+                # HEAD not allowed; ask for a single byte instead
+                response.close()
+                response = session.get(
+                    url, headers={**headers, "Range": "bytes=0-0"}, timeout=15, stream=True
+                )
+
+            with response:
                 if response.status_code == 304:
                     # Not modified
                     return prev_ts if prev_ts > 0 else now
 
-                elif response.status_code == 200:
-                    # Check ETag for changes
+                elif response.status_code in (200, 206):
                     etag = response.headers.get("ETag")
+                    last_modified = response.headers.get("Last-Modified")
+                    if last_modified:
+                        url_meta["last_modified"] = last_modified
 
                     if etag and etag != prev_etag:
-                        # Content changed
+                        # Content changed or first time seeing ETag
                         url_meta["etag"] = etag
                         return now
-                    elif etag and not prev_etag:
-                        # First time seeing ETag
-                        url_meta["etag"] = etag
+                    elif (
+                        not etag
+                        and last_modified
+                        and prev_last_modified
+                        and last_modified != prev_last_modified
+                    ):
+                        # No ETag, but Last-Modified moved
                         return now
                     else:
-                        # No ETag change
+                        # No change
                         return prev_ts if prev_ts > 0 else now
 
                 else:
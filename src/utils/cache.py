@@ -3,7 +3,7 @@
 import threading
 from collections.abc import Callable
 from pathlib import Path
-from typing import Any, TypeVar
+from typing import TypeVar
 
 T = TypeVar("T")
 
@@ -14,14 +14,14 @@ class FileCache[T]:
     Caches file contents based on (mtime_ns, size) tuple to avoid
     unnecessary file reads when content hasn't changed.
 
-    Thread-safe implementation using RLock to prevent race conditions
-    in concurrent access scenarios.
+    Cache hits are served without taking the lock; the lock only
+    serializes reloads so concurrent misses load a file once.
     """
 
     def __init__(self) -> None:
         """Initialize empty cache with thread lock."""
-        self._cache: dict[Path, dict[str, Any]] = {}
-        self._lock = threading.RLock()
+        self._cache: dict[Path, tuple[tuple[int, int], T]] = {}
+        self._lock = threading.Lock()
 
     def _get_cache_key(self, path: Path) -> tuple[int, int] | None:
         """Get cache key from file stats.
@@ -52,15 +52,20 @@ class FileCache[T]:
         if cache_key is None:
             return None
 
+        # Fast path: entries are replaced whole, so a lock-free read is safe
+        entry = self._cache.get(path)
+        if entry is not None and entry[0] == cache_key:
+            return entry[1]
+
         with self._lock:
-            # Check if we have valid cached data
+            # Another thread may have loaded the file while we waited
             entry = self._cache.get(path)
-            if entry and entry.get("key") == cache_key:
-                return entry["data"]
+            if entry is not None and entry[0] == cache_key:
+                return entry[1]
 
             # Load and cache new data
             data = loader(path)
-            self._cache[path] = {"key": cache_key, "data": data}
+            self._cache[path] = (cache_key, data)
             return data
 
     def invalidate(self, path: Path) -> None:
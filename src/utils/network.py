@@ -23,8 +23,8 @@ def get_client_ip(request: Request) -> str:
     # Priority 1: X-Forwarded-For (leftmost IP is the original client)
     forwarded_for = request.headers.get("X-Forwarded-For")
     if forwarded_for:
-        # Take the first IP from comma-separated list
-        client_ip = forwarded_for.split(",")[0].strip()
+        # Take the first IP from comma-separated list without splitting the rest
+        client_ip = forwarded_for.partition(",")[0].strip()
         if client_ip:
             return client_ip
 
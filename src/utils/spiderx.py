@@ -1,11 +1,13 @@
 """Spider-X path generator for obfuscation."""
 
+import base64
 import logging
 import random
 import secrets
+import threading
+from typing import Final
 
 from ..constants import (
-    SPIDERX_CANDIDATES,
     SPIDERX_MAX_LENGTH,
     SPIDERX_MIN_LENGTH,
     get_reserved_paths,
@@ -13,6 +15,17 @@ from ..constants import (
 
 logger = logging.getLogger(__name__)
 
+# Random bytes whose URL-safe base64 encoding covers the longest path; a
+# multiple of 3 so a batch encodes into equal, unpadded per-path chunks
+_TOKEN_BYTES: Final[int] = -(-SPIDERX_MAX_LENGTH // 4) * 3
+_TOKEN_CHARS: Final[int] = _TOKEN_BYTES // 3 * 4
+
+# Allowed path lengths (without the leading '/')
+_PATH_LENGTHS: Final[range] = range(SPIDERX_MIN_LENGTH, SPIDERX_MAX_LENGTH + 1)
+
+# Number of paths generated per pool refill
+_POOL_SIZE: Final[int] = 256
+
 
 class SpiderXGenerator:
     """Generates random spider-x paths for VPN obfuscation.
@@ -29,12 +42,17 @@ class SpiderXGenerator:
         """
         self._used_paths: set[str] = set()
         self._max_cache_size = max_cache_size
+        # Pre-generated unique paths, already recorded in _used_paths
+        self._pool: list[str] = []
+        self._pool_size = min(_POOL_SIZE, max_cache_size)
+        # One generator is shared by all request threads
+        self._lock = threading.Lock()
 
     def generate(self, max_attempts: int = 1000) -> str:
         """Generate a new unique spider-x path.
 
         Args:
-            max_attempts: Maximum number of generation attempts before fallback
+            max_attempts: Maximum number of batch refill attempts before fallback
 
         Returns:
             Random path starting with '/' that doesn't collide with
@@ -46,20 +64,20 @@ class SpiderXGenerator:
             >>> path.startswith('/')
             True
         """
-        # Clear cache if it's too large to prevent memory leak
-        if len(self._used_paths) > self._max_cache_size:
-            logger.warning(f"SpiderX cache size exceeded {self._max_cache_size}, clearing cache")
-            self._used_paths.clear()
+        with self._lock:
+            # Clear cache if it's too large to prevent memory leak
+            if len(self._used_paths) > self._max_cache_size:
+                logger.warning(
+                    f"SpiderX cache size exceeded {self._max_cache_size}, clearing cache"
+                )
+                self._used_paths.clear()
+                self._pool.clear()
 
-        # Try to generate unique path with maximum attempts
-        reserved_paths = get_reserved_paths()
-        for _attempt in range(max_attempts):
-            path = self._generate_candidate()
+            if not self._pool:
+                self._refill_pool(max_attempts)
 
-            # Ensure no collision with reserved or used paths
-            if path not in reserved_paths and path not in self._used_paths:
-                self._used_paths.add(path)
-                return path
+            if self._pool:
+                return self._pool.pop()
 
         # Fallback: return path without collision check
         logger.warning(
@@ -68,6 +86,60 @@ class SpiderXGenerator:
         )
         return self._generate_candidate()
 
+    def generate_many(self, count: int) -> list[str]:
+        """Generate several distinct spider-x paths at once.
+
+        Args:
+            count: Number of paths to generate
+
+        Returns:
+            List of unique paths, in the order they were generated
+        """
+        # A dict keeps insertion order, so it works as an ordered set here
+        paths: dict[str, None] = {}
+        while len(paths) < count:
+            paths.update(dict.fromkeys(self.generate() for _ in range(count - len(paths))))
+
+        return list(paths)
+
+    def _refill_pool(self, max_attempts: int) -> None:
+        """Fill the pool with a batch of fresh unique paths.
+
+        Candidates are checked against reserved and used paths with set
+        differences over the whole batch rather than one path at a time.
+        Must be called with the lock held.
+
+        Args:
+            max_attempts: Maximum number of batches to try
+        """
+        reserved_paths = get_reserved_paths()
+        for _attempt in range(max_attempts):
+            candidates = self._generate_candidates(self._pool_size)
+            fresh = candidates - reserved_paths - self._used_paths
+            if fresh:
+                self._used_paths |= fresh
+                self._pool.extend(fresh)
+                return
+
+    def _generate_candidates(self, count: int) -> set[str]:
+        """Generate a batch of candidate paths from one draw of random bytes.
+
+        Args:
+            count: Number of candidates to draw
+
+        Returns:
+            Set of candidate path strings (duplicates collapse)
+        """
+        encoded = base64.urlsafe_b64encode(secrets.token_bytes(_TOKEN_BYTES * count))
+        tokens = encoded.decode("ascii").lower()
+        offsets = range(0, _TOKEN_CHARS * count, _TOKEN_CHARS)
+        lengths = random.choices(_PATH_LENGTHS, k=count)
+
+        return {
+            "/" + tokens[offset : offset + length]
+            for offset, length in zip(offsets, lengths, strict=True)
+        }
+
     def _generate_candidate(self) -> str:
         """Generate a single candidate path.
 
@@ -76,21 +148,13 @@ class SpiderXGenerator:
         """
         target_length = random.randint(SPIDERX_MIN_LENGTH, SPIDERX_MAX_LENGTH)
 
-        # Try different token byte lengths
-        for byte_count in SPIDERX_CANDIDATES:
-            token = secrets.token_urlsafe(byte_count)
-            # Clean up base64 characters
-            cleaned = token.rstrip("=").replace(".", "_").replace("-", "-")
-
-            if len(cleaned) >= target_length:
-                token = cleaned[:target_length]
-                break
-        else:
-            # Fallback if no candidate worked
-            token = secrets.token_urlsafe(16).rstrip("=").replace(".", "_")
+        # One token long enough for any target length, then cut to size
+        token = secrets.token_urlsafe(_TOKEN_BYTES)
 
-        return "/" + token.lower()
+        return "/" + token[:target_length].lower()
 
     def reset(self) -> None:
         """Reset the used paths tracking."""
-        self._used_paths.clear()
+        with self._lock:
+            self._used_paths.clear()
+            self._pool.clear()
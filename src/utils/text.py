@@ -1,15 +1,57 @@
 """Text processing utilities."""
 
-import codecs
 import logging
+import re
+import unicodedata
+from functools import lru_cache
+from typing import Final
 
 logger = logging.getLogger(__name__)
 
+# Every escape the unicode_escape codec understands: simple one-letter escapes,
+# \xXX, \uXXXX, \UXXXXXXXX, octal and \N{name}. An escaped backslash is one of
+# the simple escapes, so the "u" after it is not mistaken for an escape
+_ESCAPE_PATTERN: Final[re.Pattern[str]] = re.compile(
+    r"\\(?:([\\'\"abfnrtv])|x([0-9a-fA-F]{2})|u([0-9a-fA-F]{4})|U([0-9a-fA-F]{8})"
+    r"|([0-7]{1,3})|N\{([^}]+)\})"
+)
+_SIMPLE_ESCAPES: Final[dict[str, str]] = {
+    "\\": "\\",
+    "'": "'",
+    '"': '"',
+    "a": "\a",
+    "b": "\b",
+    "f": "\f",
+    "n": "\n",
+    "r": "\r",
+    "t": "\t",
+    "v": "\v",
+}
 
+
+def _replace_escape(match: re.Match[str]) -> str:
+    """Turn one matched escape sequence into its character."""
+    group = match.lastindex
+    value = match.group(group)
+    if group == 1:
+        return _SIMPLE_ESCAPES[value]
+    if group == 5:
+        return chr(int(value, 8))
+    if group == 6:
+        return unicodedata.lookup(value)
+    return chr(int(value, 16))
+
+
+@lru_cache(maxsize=2048)
 def decode_unicode_escapes(text: str) -> str:
     """Decode unicode escape sequences in text.
 
     Handles \\u and \\U escape sequences commonly found in configuration files.
+    Text containing one of them is decoded like the unicode_escape codec, so
+    \\\\, \\t, \\n, \\xXX and the other Python escapes are decoded too; text
+    without them is returned as is. Characters that are already non-ASCII are
+    left untouched. Results are memoized, since the same descriptions are
+    decoded again on every reload.
 
     Args:
         text: Input text potentially containing unicode escapes
@@ -25,7 +67,7 @@ def decode_unicode_escapes(text: str) -> str:
         return text
 
     try:
-        return codecs.decode(text, "unicode_escape")
-    except (UnicodeDecodeError, ValueError) as e:
+        return _ESCAPE_PATTERN.sub(_replace_escape, text)
+    except (KeyError, ValueError) as e:
         logger.warning(f"Failed to decode unicode escapes in '{text[:50]}...': {e}")
         return text
@@ -4,10 +4,13 @@ import json
 import logging
 import re
 import time
+from collections.abc import Iterable
 from pathlib import Path
 from typing import Any, Final
+from wsgiref.types import StartResponse, WSGIApplication, WSGIEnvironment
 
 from flask import Flask, Request, Response, abort, g, redirect, request
+from werkzeug.exceptions import HTTPException
 
 from .. import config as config_module
 from ..constants import (
@@ -21,33 +24,97 @@ from ..utils import get_client_ip
 
 logger = logging.getLogger(__name__)
 
+# Remote addresses accepted as local reverse-proxy connections
+_LOCALHOST_ADDRESSES: Final[frozenset[str]] = frozenset({"127.0.0.1", "::1", "localhost"})
 
-def _is_secure_connection(request_obj: Request) -> bool:
-    """Check if connection is from localhost or through HTTPS reverse proxy.
+
+def _is_secure_origin(
+    remote_addr: str | None, forwarded_proto: str | None, *, log_allowed: bool = True
+) -> bool:
+    """Check if a connection comes from localhost, directly or via an HTTPS proxy.
 
     Args:
-        request_obj: Flask request object
+        remote_addr: Remote address of the connection
+        forwarded_proto: X-Forwarded-Proto header value, if any
+        log_allowed: Whether to log allowed connections at DEBUG level
 
     Returns:
         True if connection is secure (localhost or HTTPS proxy), False otherwise
     """
-    remote_addr = request_obj.remote_addr
-    if remote_addr not in ("127.0.0.1", "::1", "localhost"):
+    if remote_addr not in _LOCALHOST_ADDRESSES:
         logger.warning(f"Access denied: non-localhost connection - Remote: {remote_addr}")
         return False
 
-    forwarded_proto = request_obj.headers.get("X-Forwarded-Proto", "").lower()
-    if forwarded_proto and forwarded_proto != "https":
+    if forwarded_proto and forwarded_proto.lower() != "https":
         logger.warning(
             "Access denied: insecure proxy connection - "
             f"Remote: {remote_addr}, Proto: {forwarded_proto}"
         )
         return False
 
-    logger.debug(f"Access allowed: localhost connection from {remote_addr}")
+    if log_allowed and logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"Access allowed: localhost connection from {remote_addr}")
     return True
 
 
+def _is_secure_connection(request_obj: Request) -> bool:
+    """Check if connection is from localhost or through HTTPS reverse proxy.
+
+    Allowed connections were already logged by the WSGI guard, so only
+    rejections are logged here.
+
+    Args:
+        request_obj: Flask request object
+
+    Returns:
+        True if connection is secure (localhost or HTTPS proxy), False otherwise
+    """
+    return _is_secure_origin(
+        request_obj.remote_addr, request_obj.headers.get("X-Forwarded-Proto"), log_allowed=False
+    )
+
+
+def _secure_only(wsgi_app: WSGIApplication) -> WSGIApplication:
+    """Wrap a WSGI app so insecure connections are rejected before Flask runs.
+
+    Rejected requests get the same redirect to "/" and the same log lines as
+    the Flask error handler and access log, without pushing a request context.
+    The before_request check stays as a safety net.
+
+    Args:
+        wsgi_app: WSGI application to protect
+
+    Returns:
+        WSGI application that only passes secure connections through
+    """
+
+    def secure_only(environ: WSGIEnvironment, start_response: StartResponse) -> Iterable[bytes]:
+        start_time_ns = time.monotonic_ns()
+        if _is_secure_origin(environ.get("REMOTE_ADDR"), environ.get("HTTP_X_FORWARDED_PROTO")):
+            return wsgi_app(environ, start_response)
+
+        # Rejections are rare, so only they pay for parsing the environ
+        rejected = Request(environ)
+        client_ip = get_client_ip(rejected)
+        logger.warning(
+            f"Access denied - Path: {rejected.path} - IP: {client_ip} - "
+            f"UA: {rejected.headers.get('User-Agent', '') or 'N/A'}"
+        )
+        if logger.isEnabledFor(logging.INFO):
+            duration = (time.monotonic_ns() - start_time_ns) / 1e9
+            logger.info(
+                f"{rejected.method} {rejected.path} - "
+                "Status: 302 - "
+                f"IP: {client_ip} - "
+                f"Duration: {duration:.3f}s"
+            )
+
+        start_response("302 FOUND", [("Location", "/"), ("Content-Length", "0")])
+        return [b""]
+
+    return secure_only
+
+
 # Happ client user agent pattern for routing header compatibility
 _HAPP_USER_AGENT_PATTERN: Final[re.Pattern[str]] = re.compile(
     r"^Happ/\d+\.\d+\.\d+/(ios|android)/\d+$", re.IGNORECASE
@@ -91,6 +158,19 @@ def _matches_subscription_user_agent_policy(
 class WebApplication:
     """Main web application for VPN/Proxy configuration distribution."""
 
+    __slots__ = (
+        "_happ_routing_config",
+        "_incy_routing_config",
+        "_static_headers",
+        "_subscription_user_agent_blocklist_pattern",
+        "_subscription_user_agent_whitelist_pattern",
+        "_user_agent_headers",
+        "app",
+        "config",
+        "config_service",
+        "geo_service",
+    )
+
     def __init__(self, config: AppConfig) -> None:
         """Initialize web application.
 
@@ -108,11 +188,25 @@ class WebApplication:
         self._subscription_user_agent_blocklist_pattern = (
             config_module.env_config.subscription_user_agent_blocklist_pattern
         )
-        self._custom_headers = config_module.env_config.custom_headers
+        # Split custom headers once: unconditional ones are applied in a single
+        # update, User-Agent filtered ones are applied after them when matched
+        custom_headers = config_module.env_config.custom_headers
+        self._static_headers: tuple[tuple[str, str], ...] = tuple(
+            (header["name"], header["value"])
+            for header in custom_headers
+            if not header.get("user_agent_re")
+        )
+        self._user_agent_headers: tuple[tuple[str, str, re.Pattern[str]], ...] = tuple(
+            (header["name"], header["value"], header["user_agent_re"])
+            for header in custom_headers
+            if header.get("user_agent_re")
+        )
 
-        # Initialize Flask app
-        self.app = Flask(__name__)
+        # Initialize Flask app; no static route, so the URL map only holds the
+        # secret-path rules and matching stays cheap
+        self.app = Flask(__name__, static_folder=None)
         self.app.config["JSON_SORT_KEYS"] = config_module.env_config.flask_json_sort_keys
+        self.app.wsgi_app = _secure_only(self.app.wsgi_app)  # type: ignore[method-assign]
 
         # Register middleware
         self._register_middleware()
@@ -132,8 +226,10 @@ class WebApplication:
         @self.app.before_request
         def before_request() -> None:
             """Log incoming request and store request start time."""
-            g.start_time = time.time()
+            g.start_time_ns = time.monotonic_ns()
             g.client_ip = get_client_ip(request)
+            # Read the User-Agent once; every later step uses g.user_agent
+            g.user_agent = request.headers.get("User-Agent", "")
 
             # Security check: only allow localhost or HTTPS reverse proxy
             if not _is_secure_connection(request):
@@ -143,33 +239,32 @@ class WebApplication:
                 )
                 abort(403)
 
-            # Log all incoming requests at DEBUG level
-            logger.debug(
-                f"Incoming request: {request.method} {request.path} "
-                f"from {g.client_ip} - UA: {request.headers.get('User-Agent', 'N/A')}"
-            )
+            # Log all incoming requests at DEBUG level; skip building the
+            # message entirely when DEBUG is off
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    f"Incoming request: {request.method} {request.path} "
+                    f"from {g.client_ip} - UA: {g.user_agent or 'N/A'}"
+                )
 
         @self.app.after_request
         def after_request(response: Response) -> Response:
             """Log response details after request processing."""
-            duration = time.time() - getattr(g, "start_time", time.time())
-            client_ip = getattr(g, "client_ip", "unknown")
-
             # Log response at INFO or WARNING level depending on status
-            if response.status_code < 400:
-                logger.info(
-                    f"{request.method} {request.path} - "
-                    f"Status: {response.status_code} - "
-                    f"IP: {client_ip} - "
-                    f"Duration: {duration:.3f}s"
-                )
-            else:
-                logger.warning(
-                    f"{request.method} {request.path} - "
-                    f"Status: {response.status_code} - "
-                    f"IP: {client_ip} - "
-                    f"Duration: {duration:.3f}s"
-                )
+            level = logging.INFO if response.status_code < 400 else logging.WARNING
+            if not logger.isEnabledFor(level):
+                return response
+
+            now_ns = time.monotonic_ns()
+            duration = (now_ns - getattr(g, "start_time_ns", now_ns)) / 1e9
+            client_ip = getattr(g, "client_ip", "unknown")
+            logger.log(
+                level,
+                f"{request.method} {request.path} - "
+                f"Status: {response.status_code} - "
+                f"IP: {client_ip} - "
+                f"Duration: {duration:.3f}s",
+            )
 
             return response
 
@@ -183,11 +278,9 @@ class WebApplication:
 
         self.app.route(f"/{secret_path}/<path:user_path>")(self.handle_request)
 
-        # Error handlers
-        for error_code in (403, 404, 500):
-            self.app.errorhandler(error_code)(self.handle_error)
-
-        self.app.errorhandler(Exception)(self.handle_error)
+        # Error handlers: one for every HTTP error code, one for anything else
+        self.app.register_error_handler(HTTPException, self.handle_error)
+        self.app.register_error_handler(Exception, self.handle_error)
 
     def handle_request(self, user_path: str) -> Response:
         """Handle configuration request.
@@ -199,7 +292,7 @@ class WebApplication:
             Configuration response
         """
         client_ip = getattr(g, "client_ip", "unknown")
-        user_agent = request.headers.get("User-Agent", "N/A")
+        user_agent = getattr(g, "user_agent", "") or "N/A"
 
         if not _matches_subscription_user_agent_policy(
             user_agent,
@@ -221,14 +314,15 @@ class WebApplication:
             abort(503)  # Service Unavailable
 
         # Log successful config generation
-        logger.info(
-            f"Generating config for user '{user.comment}' "
-            f"(ID: {user.id[:8]}...) - "
-            f"Format: {format_type} - "
-            f"IP: {client_ip} - "
-            f"UA: {user_agent} - "
-            f"Groups: {', '.join(user.groups)}"
-        )
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                f"Generating config for user '{user.comment}' "
+                f"(ID: {user.id[:8]}...) - "
+                f"Format: {format_type} - "
+                f"IP: {client_ip} - "
+                f"UA: {user_agent} - "
+                f"Groups: {', '.join(user.groups)}"
+            )
 
         # Generate appropriate configuration
         try:
@@ -259,10 +353,11 @@ class WebApplication:
         if error_code == 403:
             logger.warning(
                 f"Access denied - Path: {request.path} - IP: {client_ip} - "
-                f"UA: {request.headers.get('User-Agent', 'N/A')}"
+                f"UA: {getattr(g, 'user_agent', '') or 'N/A'}"
             )
         elif error_code == 404:
-            logger.info(f"Not found - Path: {request.path} - IP: {client_ip}")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(f"Not found - Path: {request.path} - IP: {client_ip}")
         else:
             logger.error(
                 f"Server error ({error_code}) - Path: {request.path} - "
@@ -285,10 +380,8 @@ class WebApplication:
             403: If user not found
         """
         client_ip = getattr(g, "client_ip", "unknown")
-        segments = [s for s in user_path.split("/") if s]
-
-        # First segment is user lookup key
-        lookup_key = segments[0] if segments else ""
+        # First non-empty segment is user lookup key
+        lookup_key, _, rest = user_path.lstrip("/").partition("/")
         if not lookup_key:
             logger.warning(f"Empty user path - IP: {client_ip}")
             abort(403)
@@ -299,13 +392,15 @@ class WebApplication:
             logger.warning(f"User not found: '{lookup_key}' - IP: {client_ip}")
             abort(403)
 
-        # Determine format type
+        # Determine format type from the last recognized segment; empty
+        # segments never match, so they need no filtering
         format_type = "json"  # default
-        for format_segment in reversed(segments[1:]):
-            mapped_format = _FORMAT_TYPES.get(format_segment.lower())
-            if mapped_format:
-                format_type = mapped_format
-                break
+        if rest:
+            for format_segment in reversed(rest.split("/")):
+                mapped_format = _FORMAT_TYPES.get(format_segment.lower())
+                if mapped_format:
+                    format_type = mapped_format
+                    break
 
         return user, format_type
 
@@ -321,8 +416,7 @@ class WebApplication:
             Text response with subscription links
         """
         content = self.config_service.build_v2ray_config(servers, user, user_agent=user_agent)
-        response = Response(content, mimetype=MIME_TYPE_TEXT)
-        return self._apply_headers(response)
+        return self._make_response(content, MIME_TYPE_TEXT)
 
     def _build_mihomo_response(self, servers, user, user_agent: str) -> Response:
         """Build Mihomo/Clash configuration response.
@@ -336,13 +430,7 @@ class WebApplication:
             YAML file response
         """
         content = self.config_service.build_mihomo_config(servers, user, user_agent=user_agent)
-        response = Response(content, mimetype=MIME_TYPE_YAML)
-        response = self._apply_headers(response)
-
-        # Add attachment header
-        response.headers["content-disposition"] = 'attachment; filename="sub"'
-
-        return response
+        return self._make_response(content, MIME_TYPE_YAML, attachment=True)
 
     def _build_json_response(self, servers, user, user_agent: str) -> Response:
         """Build legacy JSON configuration response.
@@ -356,48 +444,52 @@ class WebApplication:
             JSON response
         """
         content = self.config_service.build_legacy_config(servers, user, user_agent=user_agent)
-        response = Response(content, mimetype=MIME_TYPE_JSON)
-        return self._apply_headers(response)
+        return self._make_response(content, MIME_TYPE_JSON)
 
-    def _apply_headers(self, response: Response) -> Response:
-        """Apply common headers to response.
+    def _make_response(self, content: bytes, mimetype: str, attachment: bool = False) -> Response:
+        """Create a config response with all common headers applied.
 
         Args:
-            response: Response to modify
+            content: Response body
+            mimetype: Response MIME type
+            attachment: Whether to mark the body as a downloadable "sub" file
 
         Returns:
-            Modified response
+            Response with custom, routing and disposition headers
         """
-        user_agent = request.headers.get("User-Agent", "")
+        response = Response(content, mimetype=mimetype)
+        user_agent = getattr(g, "user_agent", "")
 
         # Apply custom headers from environment configuration
-        for header_config in self._custom_headers:
-            header_name = header_config["name"]
-            header_value = header_config["value"]
-            user_agent_re = header_config.get("user_agent_re")
-
-            # If user-agent regex is specified, only apply header if it matches
-            if user_agent_re:
-                if user_agent_re.search(user_agent):
-                    response.headers[header_name] = header_value
-            else:
-                # No user-agent filter, always apply the header
+        if self._static_headers:
+            response.headers.update(self._static_headers)
+
+        # User-agent filtered headers only apply when the regex matches
+        for header_name, header_value, user_agent_re in self._user_agent_headers:
+            if user_agent_re.search(user_agent):
                 response.headers[header_name] = header_value
 
+        # Most clients are neither Happ nor Incy; reject them on the prefix
+        # before running the full version patterns
+        client_prefix = user_agent[:5].lower()
+
         # Keep backward compatibility: apply Happ routing header for compatible clients
         # This is now handled separately for special routing logic
-        if _HAPP_USER_AGENT_PATTERN.match(user_agent):
+        if client_prefix == "happ/" and _HAPP_USER_AGENT_PATTERN.match(user_agent):
             routing_header = self.geo_service.build_routing_header(self._happ_routing_config)
             if routing_header:
                 response.headers["routing"] = routing_header
 
-        if _INCY_USER_AGENT_PATTERN.match(user_agent):
+        if client_prefix == "incy/" and _INCY_USER_AGENT_PATTERN.match(user_agent):
             routing_header = self.geo_service.build_routing_header(
                 self._incy_routing_config, scheme="incy"
             )
             if routing_header:
                 response.headers["routing"] = routing_header
 
+        if attachment:
+            response.headers["content-disposition"] = 'attachment; filename="sub"'
+
         return response
 
     def _load_routing_config(self, path: Path, client_name: str) -> dict[str, Any]:
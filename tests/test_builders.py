@@ -1,10 +1,60 @@
 """Tests for configuration builders."""
 
+from collections.abc import Callable
+
+import pytest
 import yaml
 
 from src.builders import LegacyJsonBuilder, MihomoBuilder, V2RayBuilder
+from src.builders.base import BaseConfigBuilder
 from src.models import Server, UserInfo
 
+# Shared read-only group sets
+_PREMIUM_GROUPS: frozenset[str] = frozenset(["premium"])
+_BASIC_GROUPS: frozenset[str] = frozenset(["basic"])
+
+# One server the sample user can reach and one it cannot
+_GROUP_FILTER_SERVERS: tuple[Server, ...] = (
+    Server(host="premium.example.com", description="Premium Server", groups=_PREMIUM_GROUPS),
+    Server(host="basic.example.com", description="Basic Server", groups=_BASIC_GROUPS),
+)
+
+_BUILDER_FACTORIES: dict[str, Callable[[], BaseConfigBuilder]] = {
+    "mihomo": lambda: MihomoBuilder(
+        template_loader=lambda template_name=None, user_agent="": {
+            "proxy-template": {"type": "vless"}
+        }
+    ),
+    "v2ray": lambda: V2RayBuilder(
+        template_loader=lambda user_agent="": "vless://<ID>@<ADDRESS>:443#<NAME>"
+    ),
+    "legacy_json": lambda: LegacyJsonBuilder(
+        json_loader=lambda user_agent="": [
+            {
+                "remarks": "",
+                "outbounds": [
+                    {"protocol": "vless", "settings": {"address": None, "port": 443, "id": None}}
+                ],
+            }
+        ]
+    ),
+}
+
+
+class TestGroupFiltering:
+    """Group filtering shared by every builder."""
+
+    @pytest.mark.parametrize("builder_name", sorted(_BUILDER_FACTORIES))
+    def test_build_includes_only_accessible_servers(self, builder_name: str, sample_user: UserInfo):
+        """Only servers in the user's groups should appear in the output."""
+        builder = _BUILDER_FACTORIES[builder_name]()
+
+        output = builder.build(list(_GROUP_FILTER_SERVERS), sample_user).decode("utf-8")
+
+        assert "premium.example.com" in output
+        assert "basic.example.com" not in output
+        assert "Basic" not in output
+
 
 class TestMihomoBuilder:
     """Tests for MihomoBuilder."""
@@ -43,7 +93,7 @@ class TestMihomoBuilder:
             is_external=True,
             fixed_id="ext-uuid",
             fixed_short_id="ext-short",
-            groups=frozenset(["premium"]),
+            groups=_PREMIUM_GROUPS,
         )
 
         template = {
@@ -64,31 +114,6 @@ class TestMihomoBuilder:
         assert "ext-uuid" in config_str
         assert "ext-short" in config_str
 
-    def test_build_filters_servers_by_groups(self, sample_user: UserInfo):
-        """Test that only accessible servers are included."""
-        servers = [
-            Server(
-                host="premium.example.com",
-                description="Premium",
-                groups=frozenset(["premium"]),
-            ),
-            Server(
-                host="basic.example.com",
-                description="Basic",
-                groups=frozenset(["basic"]),
-            ),
-        ]
-
-        template = {"proxy-template": {"type": "vless"}}
-        builder = MihomoBuilder(template_loader=lambda template_name=None, user_agent="": template)
-
-        # User with premium group
-        result = builder.build(servers, sample_user)
-        config_str = result.decode("utf-8")
-
-        assert "Premium" in config_str
-        assert "Basic" not in config_str
-
     def test_build_no_eligible_servers_raises(self, sample_user: UserInfo):
         """Test that building with no eligible servers raises error."""
         servers = [
@@ -102,18 +127,14 @@ class TestMihomoBuilder:
         template = {"proxy-template": {"type": "vless"}}
         builder = MihomoBuilder(template_loader=lambda template_name=None, user_agent="": template)
 
-        # Should raise ValueError
-        try:
+        with pytest.raises(ValueError, match=r"(?i)no access"):
             builder.build(servers, sample_user)
-            raise AssertionError("Expected ValueError")
-        except ValueError as e:
-            assert "no access" in str(e).lower()
 
     def test_substitute_proxy_names(self, sample_user: UserInfo):
         """Test that __PROXY_NAMES__ is substituted correctly."""
         servers = [
-            Server(host="s1.example.com", description="Server 1", groups=frozenset(["premium"])),
-            Server(host="s2.example.com", description="Server 2", groups=frozenset(["premium"])),
+            Server(host="s1.example.com", description="Server 1", groups=_PREMIUM_GROUPS),
+            Server(host="s2.example.com", description="Server 2", groups=_PREMIUM_GROUPS),
         ]
 
         template = {
@@ -129,6 +150,30 @@ class TestMihomoBuilder:
         assert "Server 1" in config_str
         assert "Server 2" in config_str
 
+    def test_substitute_proxy_names_inside_list(self, sample_user: UserInfo):
+        """Placeholder list items should expand in place, keeping neighbours."""
+        servers = [
+            Server(host="s1.example.com", description="Server 1", groups=_PREMIUM_GROUPS),
+            Server(host="s2.example.com", description="Server 2", groups=_PREMIUM_GROUPS),
+        ]
+
+        template = {
+            "proxy-template": {"type": "vless"},
+            "proxy-groups": [
+                {"name": "select", "proxies": ["DIRECT", "__PROXY_NAMES__", "REJECT"]},
+                {"name": "auto", "proxies": "__PROXY_NAMES__"},
+            ],
+        }
+
+        builder = MihomoBuilder(template_loader=lambda template_name=None, user_agent="": template)
+        config = yaml.safe_load(builder.build(servers, sample_user))
+
+        assert config["proxy-groups"] == [
+            {"name": "select", "proxies": ["DIRECT", "Server 1", "Server 2", "REJECT"]},
+            {"name": "auto", "proxies": ["Server 1", "Server 2"]},
+        ]
+        assert template["proxy-groups"][0]["proxies"][1] == "__PROXY_NAMES__"
+
     def test_build_appends_to_existing_proxies(self, sample_user: UserInfo, sample_server: Server):
         """Test that existing proxies are preserved and generated proxies are appended."""
         template = {
@@ -191,11 +236,25 @@ class TestV2RayBuilder:
         assert sample_user.id in links[0]
         assert sample_server.host in links[0]
 
+    def test_build_replaces_repeated_placeholders(
+        self, sample_user: UserInfo, sample_server: Server
+    ):
+        """Every occurrence of a placeholder should be substituted."""
+        template = "vless://<ID>@<ADDRESS>:443?pbk=<PBK>&sid=<SHORTID>#<ADDRESS>"
+
+        builder = V2RayBuilder(template_loader=lambda user_agent="": template)
+        result = builder.build([sample_server], sample_user)
+
+        assert result.decode("utf-8") == (
+            f"vless://{sample_user.id}@{sample_server.host}:443"
+            f"?pbk={sample_server.public_key}&sid={sample_user.short_id}#{sample_server.host}"
+        )
+
     def test_build_multiple_servers(self, sample_user: UserInfo):
         """Test building subscription with multiple servers."""
         servers = [
-            Server(host="s1.example.com", description="Server 1", groups=frozenset(["premium"])),
-            Server(host="s2.example.com", description="Server 2", groups=frozenset(["premium"])),
+            Server(host="s1.example.com", description="Server 1", groups=_PREMIUM_GROUPS),
+            Server(host="s2.example.com", description="Server 2", groups=_PREMIUM_GROUPS),
         ]
 
         template = "vless://<ID>@<ADDRESS>:443#<NAME>"
@@ -203,10 +262,11 @@ class TestV2RayBuilder:
         builder = V2RayBuilder(template_loader=lambda user_agent="": template)
         result = builder.build(servers, sample_user)
 
-        links = result.decode("utf-8").split("\n")
+        links_str = result.decode("utf-8")
+        links = links_str.split("\n")
         assert len(links) == 2
-        assert "s1.example.com" in result.decode("utf-8")
-        assert "s2.example.com" in result.decode("utf-8")
+        assert "s1.example.com" in links_str
+        assert "s2.example.com" in links_str
 
     def test_build_with_spiderx_for_internal(self, sample_user: UserInfo):
         """Test that spider-x is generated for internal servers."""
@@ -214,7 +274,7 @@ class TestV2RayBuilder:
             host="internal.example.com",
             description="Internal",
             is_external=False,
-            groups=frozenset(["premium"]),
+            groups=_PREMIUM_GROUPS,
         )
 
         template = "vless://<ID>@<ADDRESS>:443?spx=%2F<SPIDERX>#<NAME>"
@@ -234,7 +294,7 @@ class TestV2RayBuilder:
             description="External",
             is_external=True,
             fixed_id="ext-id",
-            groups=frozenset(["premium"]),
+            groups=_PREMIUM_GROUPS,
         )
 
         template = "vless://<ID>@<ADDRESS>:443?spx=%2F<SPIDERX>#<NAME>"
@@ -248,31 +308,13 @@ class TestV2RayBuilder:
         # spx should be empty (just %2F without path)
         assert "spx=%2F&" in link or "spx=%2F#" in link
 
-    def test_build_filters_by_groups(self, sample_user: UserInfo):
-        """Test that only accessible servers are included."""
-        servers = [
-            Server(
-                host="premium.example.com", description="Premium", groups=frozenset(["premium"])
-            ),
-            Server(host="basic.example.com", description="Basic", groups=frozenset(["basic"])),
-        ]
-
-        template = "vless://<ID>@<ADDRESS>:443#<NAME>"
-
-        builder = V2RayBuilder(template_loader=lambda user_agent="": template)
-        result = builder.build(servers, sample_user)
-
-        links_str = result.decode("utf-8")
-        assert "premium.example.com" in links_str
-        assert "basic.example.com" not in links_str
-
     def test_build_url_encodes_values(self, sample_user: UserInfo):
         """Test that special characters are URL-encoded."""
         server = Server(
             host="test.example.com",
             description="Test 🇸🇪 Server",
             alias="sni.example.com",
-            groups=frozenset(["premium"]),
+            groups=_PREMIUM_GROUPS,
         )
 
         template = "vless://<ID>@<ADDRESS>:443?sni=<SERVERNAME>#<NAME>"
@@ -313,49 +355,11 @@ class TestLegacyJsonBuilder:
         result = builder.build([sample_server], sample_user)
 
         assert isinstance(result, bytes)
-        configs = json.loads(result.decode("utf-8"))
+        configs = json.loads(result)
 
         assert isinstance(configs, list)
         assert len(configs) > 0
 
-    def test_build_filters_servers(self, sample_user: UserInfo):
-        """Test that servers are filtered by group access."""
-        servers = [
-            Server(
-                host="premium.example.com",
-                description="Premium Server",
-                groups=frozenset(["premium"]),
-            ),
-            Server(
-                host="basic.example.com", description="Basic Server", groups=frozenset(["basic"])
-            ),
-        ]
-
-        template = [
-            {
-                "remarks": "",
-                "outbounds": [
-                    {
-                        "protocol": "vless",
-                        "settings": {
-                            "address": None,
-                            "port": 443,
-                            "id": None,
-                        },
-                    }
-                ],
-            }
-        ]
-
-        builder = LegacyJsonBuilder(json_loader=lambda user_agent="": template)
-        result = builder.build(servers, sample_user)
-
-        config_str = result.decode("utf-8")
-        # Check that premium server description is in remarks
-        assert "Premium Server" in config_str
-        # Check that basic server is NOT included
-        assert "Basic Server" not in config_str
-
     def test_build_with_settings_format(self, sample_user: UserInfo, sample_server: Server):
         """Test building with settings format."""
         import json
@@ -393,7 +397,7 @@ class TestLegacyJsonBuilder:
         result = builder.build([sample_server], sample_user)
 
         assert isinstance(result, bytes)
-        configs = json.loads(result.decode("utf-8"))
+        configs = json.loads(result)
 
         assert isinstance(configs, list)
         assert len(configs) > 0
@@ -411,3 +415,110 @@ class TestLegacyJsonBuilder:
         assert settings["encryption"] == "none"
         assert settings["flow"] == "xtls-rprx-vision"
         assert settings["level"] == 0
+
+    def test_build_does_not_mutate_template(self, sample_user: UserInfo, sample_server: Server):
+        """Cached template blocks must stay untouched across builds."""
+        template = [
+            {
+                "remarks": "Config",
+                "outbounds": [
+                    {
+                        "settings": {"address": None, "id": None},
+                        "streamSettings": {
+                            "security": "reality",
+                            "realitySettings": {"shortId": None, "spiderX": None},
+                        },
+                    }
+                ],
+            }
+        ]
+
+        builder = LegacyJsonBuilder(json_loader=lambda user_agent="": template)
+        builder.build([sample_server], sample_user)
+
+        assert template[0]["remarks"] == "Config"
+        assert template[0]["outbounds"][0]["settings"] == {"address": None, "id": None}
+        assert template[0]["outbounds"][0]["streamSettings"]["realitySettings"] == {
+            "shortId": None,
+            "spiderX": None,
+        }
+
+    def test_dns_override_replaces_placeholders(self, sample_user: UserInfo):
+        """Test that DNS placeholders are replaced only when an override is set."""
+        import json
+
+        template = [
+            {
+                "remarks": "Config",
+                "dns": {"servers": ["DNS_PLACEHOLDER", "1.1.1.1", {"address": "8.8.8.8"}]},
+                "outbounds": [],
+            }
+        ]
+        servers = [
+            Server(host="a.example.com", description="A", dns_override="9.9.9.9"),
+            Server(host="b.example.com", description="B"),
+        ]
+
+        builder = LegacyJsonBuilder(json_loader=lambda user_agent="": template)
+        configs = json.loads(builder.build(servers, sample_user))
+
+        assert configs[0]["dns"]["servers"] == ["9.9.9.9", "1.1.1.1", {"address": "8.8.8.8"}]
+        assert configs[1]["dns"]["servers"][0] == "DNS_PLACEHOLDER"
+
+    def test_build_output_matches_json_dumps(self, sample_user: UserInfo):
+        """Test that streamed output is identical to serializing the whole array."""
+        import json
+
+        template = [{"remarks": "Конфиг", "outbounds": []}, {"remarks": "B", "outbounds": []}]
+        servers = [Server(host=f"s{i}.example.com", description=f"S{i}") for i in range(3)]
+
+        builder = LegacyJsonBuilder(json_loader=lambda user_agent="": template)
+        result = builder.build(servers, sample_user)
+
+        assert result == json.dumps(json.loads(result), ensure_ascii=False).encode("utf-8")
+
+
+class TestBaseConfigBuilder:
+    """Tests for shared builder helpers."""
+
+    def test_get_eligible_servers_filters_then_deduplicates(self, sample_user: UserInfo):
+        """Inaccessible entries must not hide an accessible server with the same host."""
+        servers = [
+            Server(host="s1.example.com", description="Basic", groups=_BASIC_GROUPS),
+            Server(host="s1.example.com", description="Premium", groups=_PREMIUM_GROUPS),
+            Server(host="s1.example.com", description="Duplicate", groups=frozenset(["vip"])),
+            Server(host="s2.example.com", description="Public"),
+        ]
+
+        eligible = BaseConfigBuilder().get_eligible_servers(servers, sample_user)
+
+        assert [server.description for server in eligible] == ["Premium", "Public"]
+
+    def test_get_eligible_servers_reuses_result_per_group_set(self, sample_user: UserInfo):
+        """Repeat lookups for the same tuple and groups should reuse the filtered result."""
+        servers = (
+            Server(host="s1.example.com", description="Premium", groups=_PREMIUM_GROUPS),
+            Server(host="s2.example.com", description="Basic", groups=_BASIC_GROUPS),
+        )
+        builder = BaseConfigBuilder()
+
+        first = builder.get_eligible_servers(servers, sample_user)
+        first.clear()
+        second = builder.get_eligible_servers(servers, sample_user)
+        reloaded = builder.get_eligible_servers(
+            (*servers, Server(host="s3.example.com", description="Public")), sample_user
+        )
+
+        assert [server.description for server in second] == ["Premium"]
+        assert [server.host for server in reloaded] == ["s1.example.com", "s3.example.com"]
+
+    def test_get_eligible_servers_sees_list_mutations(self, sample_user: UserInfo):
+        """A list mutated between calls must not be served from a stale result."""
+        servers = [Server(host="s1.example.com", description="Premium", groups=_PREMIUM_GROUPS)]
+        builder = BaseConfigBuilder()
+
+        builder.get_eligible_servers(servers, sample_user)
+        servers.append(Server(host="s2.example.com", description="Public"))
+        eligible = builder.get_eligible_servers(servers, sample_user)
+
+        assert [server.host for server in eligible] == ["s1.example.com", "s2.example.com"]
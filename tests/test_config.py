@@ -3,11 +3,26 @@
 from importlib import reload
 from pathlib import Path
 
+import pytest
+
+
+@pytest.fixture
+def reload_config_modules_after(monkeypatch):
+    """Reload config modules from the restored environment after a test reloads them."""
+    yield
+    monkeypatch.undo()
+
+    from src import config as config_module
+    from src import constants as constants_module
+
+    reload(config_module)
+    reload(constants_module)
+
 
 class TestEnvConfig:
     """Tests for environment configuration behavior."""
 
-    def test_incy_routing_file_defaults_to_incy(self, monkeypatch):
+    def test_incy_routing_file_defaults_to_incy(self, monkeypatch, reload_config_modules_after):
         """Default Incy routing file should be separate from Happ."""
         monkeypatch.setenv("SECRET_PATH", "secret")
         monkeypatch.delenv("INCY_ROUTING_FILE", raising=False)
@@ -19,7 +34,46 @@ class TestEnvConfig:
         assert config_module.env_config.happ_routing_file.name == "happ.routing"
         assert config_module.env_config.incy_routing_file.name == "incy.routing"
 
-    def test_constants_import_without_secret_path(self, monkeypatch):
+    def test_settings_are_cached_until_invalidated(self, monkeypatch):
+        """Settings should be read once and refreshed only after invalidate()."""
+        monkeypatch.setenv("WORKER_THREADS", "4")
+
+        from src.config import EnvConfig
+
+        config = EnvConfig()
+        assert config.worker_threads == 4
+
+        monkeypatch.setenv("WORKER_THREADS", "8")
+        assert config.worker_threads == 4
+
+        config.invalidate()
+        assert config.worker_threads == 8
+
+    def test_get_bool_is_case_insensitive(self, monkeypatch):
+        """Truthy values should match regardless of case."""
+        from src.config import EnvConfig
+
+        for value, expected in [("true", True), ("On", True), ("YES", True), ("0", False)]:
+            monkeypatch.setenv("SOME_FLAG", value)
+            assert EnvConfig().get_bool("SOME_FLAG") is expected
+
+        monkeypatch.delenv("SOME_FLAG")
+        assert EnvConfig().get_bool("SOME_FLAG", True) is True
+
+    def test_env_line_pattern_parses_assignments(self):
+        """The .env pattern should skip comments and trim keys and values."""
+        from src.config import _ENV_LINE_PATTERN
+
+        text = "# comment\nA=1\r\n  B = two words  \n#C=3\nD=x=y\n\nE=\n"
+
+        assert [m.groups() for m in _ENV_LINE_PATTERN.finditer(text)] == [
+            ("A", "1"),
+            ("B", "two words"),
+            ("D", "x=y"),
+            ("E", ""),
+        ]
+
+    def test_constants_import_without_secret_path(self, monkeypatch, reload_config_modules_after):
         """Constants import should not require SECRET_PATH eagerly."""
         monkeypatch.delenv("SECRET_PATH", raising=False)
 
@@ -103,3 +157,21 @@ class TestAppConfig:
         assert config.v2ray_profile_file == override_base / "templates" / "v2ray-url-template.txt"
         assert config.xray_profile_file == override_base / "templates" / "v2ray-template.json"
         assert config.mihomo_profile_file == override_base / "templates" / "mihomo-template.yaml"
+
+    def test_from_environment_reports_missing_files(self, monkeypatch, temp_dir: Path):
+        """Missing required files should all be listed in one error."""
+        (temp_dir / "servers").write_text("", encoding="utf-8")
+
+        monkeypatch.setenv("SECRET_PATH", "secret")
+        for key in ("SERVERS_FILE", "USERS_FILE", "V2RAY_TEMPLATE_FILE", "TEMPLATE_FILE"):
+            monkeypatch.delenv(key, raising=False)
+
+        from src.models import AppConfig
+
+        with pytest.raises(FileNotFoundError) as exc_info:
+            AppConfig.from_environment(base_dir=temp_dir)
+
+        message = str(exc_info.value)
+        assert "users configuration" in message
+        assert "Mihomo YAML base file" in message
+        assert "servers configuration" not in message
@@ -1,29 +1,28 @@
 """Tests for custom headers configuration."""
 
-import re
+from unittest.mock import patch
+
+from src import config as config_module
+from src import web as web_module
+from src.config import parse_custom_headers
+from src.web import create_app
 
 
 class TestCustomHeaders:
     """Tests for custom HTTP headers configuration."""
 
-    def test_custom_headers_parsing(self, monkeypatch):
+    def test_custom_headers_parsing(self):
         """Test that custom headers are parsed correctly from environment."""
-        # Set up test environment variables
-        monkeypatch.setenv("CUSTOM_HEADER_1", "profile-update-interval|24")
-        monkeypatch.setenv("CUSTOM_HEADER_2", "profile-title|base64:VGVzdFRpdGxlRXhhbXBsZQ==")
-        monkeypatch.setenv("CUSTOM_HEADER_3", r"x-special-feature|enabled|^Happ/\d+\.\d+\.\d+")
-        monkeypatch.setenv("CUSTOM_HEADER_4", "x-mobile-config|true|Mobile|Android|iPhone")
-        monkeypatch.setenv("CUSTOM_HEADER_5", "x-always-sent|always")
-
-        # Reload config to pick up new environment variables
-        from importlib import reload
-
-        from src import config as config_module
-
-        reload(config_module)
-        from src.config import env_config
-
-        headers = env_config.custom_headers
+        headers = parse_custom_headers(
+            {
+                "CUSTOM_HEADER_1": "profile-update-interval|24",
+                "CUSTOM_HEADER_2": "profile-title|base64:VGVzdFRpdGxlRXhhbXBsZQ==",
+                "CUSTOM_HEADER_3": r"x-special-feature|enabled|^Happ/\d+\.\d+\.\d+",
+                "CUSTOM_HEADER_4": "x-mobile-config|true|Mobile|Android|iPhone",
+                "CUSTOM_HEADER_5": "x-always-sent|always",
+                "UNRELATED": "ignored|value",
+            }
+        )
 
         # Verify we have all headers
         assert len(headers) >= 5
@@ -61,99 +60,66 @@ class TestCustomHeaders:
         assert h5["value"] == "always"
         assert h5["user_agent_regex"] is None
 
-    def test_user_agent_regex_matching(self, monkeypatch):
+    def test_user_agent_regex_matching(self):
         """Test user-agent regex matching logic."""
-        monkeypatch.setenv("CUSTOM_HEADER_TEST1", r"test-happ|value1|^Happ/\d+\.\d+\.\d+")
-        monkeypatch.setenv("CUSTOM_HEADER_TEST2", "test-mobile|value2|Mobile|Android|iPhone")
-
-        from importlib import reload
-
-        from src import config as config_module
-
-        reload(config_module)
-        from src.config import env_config
-
-        headers = env_config.custom_headers
+        headers = parse_custom_headers(
+            {
+                "CUSTOM_HEADER_TEST1": r"test-happ|value1|^Happ/\d+\.\d+\.\d+",
+                "CUSTOM_HEADER_TEST2": "test-mobile|value2|Mobile|Android|iPhone",
+            }
+        )
         test_headers = {h["name"]: h for h in headers if h["name"].startswith("test-")}
 
-        # Test Happ pattern
-        happ_header = test_headers.get("test-happ")
-        if happ_header:
-            regex = happ_header["user_agent_regex"]
-            assert re.search(regex, "Happ/1.2.3")
-            assert re.search(regex, "Happ/10.0.1")
-            assert not re.search(regex, "Chrome/1.0")
+        # Test Happ pattern with the regex compiled at parse time
+        happ_re = test_headers["test-happ"]["user_agent_re"]
+        assert happ_re.search("Happ/1.2.3")
+        assert happ_re.search("Happ/10.0.1")
+        assert not happ_re.search("Chrome/1.0")
 
         # Test mobile pattern
-        mobile_header = test_headers.get("test-mobile")
-        if mobile_header:
-            regex = mobile_header["user_agent_regex"]
-            assert re.search(regex, "Mozilla/5.0 (iPhone; CPU iPhone OS 14_0 like Mac OS X)")
-            assert re.search(regex, "Mozilla/5.0 (Linux; Android 10)")
-            assert re.search(regex, "Mobile Safari")
-            assert not re.search(regex, "Desktop Browser")
-
-    def test_invalid_header_format(self, monkeypatch, caplog):
+        mobile_re = test_headers["test-mobile"]["user_agent_re"]
+        assert mobile_re.search("Mozilla/5.0 (iPhone; CPU iPhone OS 14_0 like Mac OS X)")
+        assert mobile_re.search("Mozilla/5.0 (Linux; Android 10)")
+        assert mobile_re.search("Mobile Safari")
+        assert not mobile_re.search("Desktop Browser")
+
+    def test_invalid_header_format(self, caplog):
         """Test that invalid header formats are handled gracefully."""
         # Header with missing value
-        monkeypatch.setenv("CUSTOM_HEADER_INVALID1", "header-name-only")
-
-        from importlib import reload
-
-        from src import config as config_module
-
-        reload(config_module)
-        from src.config import env_config
-
-        headers = env_config.custom_headers
+        headers = parse_custom_headers({"CUSTOM_HEADER_INVALID1": "header-name-only"})
         invalid_headers = [h for h in headers if h["name"] == "header-name-only"]
 
         # Invalid header should be filtered out
         assert len(invalid_headers) == 0
         # Should have warning in logs
-        assert "Invalid custom header format" in caplog.text
+        assert any(
+            "Invalid custom header format" in record.getMessage() for record in caplog.records
+        )
 
-    def test_invalid_regex_pattern(self, monkeypatch, caplog):
+    def test_invalid_regex_pattern(self, caplog):
         """Test that invalid regex patterns are handled gracefully."""
         # Header with invalid regex
-        monkeypatch.setenv("CUSTOM_HEADER_BADREGEX", "test-header|test-value|[")
-
-        from importlib import reload
-
-        from src import config as config_module
-
-        reload(config_module)
-        from src.config import env_config
-
-        headers = env_config.custom_headers
+        headers = parse_custom_headers({"CUSTOM_HEADER_BADREGEX": "test-header|test-value|["})
         bad_headers = [h for h in headers if h["name"] == "test-header"]
 
         # Header with invalid regex should be filtered out
         assert len(bad_headers) == 0
         # Should have error in logs
-        assert "Invalid regex" in caplog.text
+        assert any("Invalid regex" in record.getMessage() for record in caplog.records)
 
     def test_custom_headers_in_response(self, app_config, monkeypatch):
         """Test that custom headers are applied to responses."""
-        # Set up custom headers
-        monkeypatch.setenv("CUSTOM_HEADER_TEST", "x-test-header|test-value")
-
-        from importlib import reload
-
-        from src import config as config_module
-        from src import constants as constants_module
-
-        reload(config_module)
-        reload(constants_module)
-
-        from unittest.mock import patch
-
-        from src.web import create_app
+        # Set up custom headers on the cached settings for this test only
+        monkeypatch.setitem(
+            vars(config_module.env_config),
+            "custom_headers",
+            parse_custom_headers({"CUSTOM_HEADER_TEST": "x-test-header|test-value"}),
+        )
 
         app = create_app(app_config)
         client = app.test_client()
 
-        with patch("src.web._is_secure_connection", return_value=True):
+        with patch.object(web_module, "_is_secure_connection", return_value=True):
             response = client.get(
                 "/secret/user1",
                 headers={"User-Agent": "Mozilla/5.0 Chrome/124.0.0.0"},
@@ -165,24 +131,16 @@ class TestCustomHeaders:
     def test_user_agent_filtered_headers(self, app_config, monkeypatch):
         """Test that user-agent filtered headers are applied conditionally."""
         # Set up header that only applies to Happ clients
-        monkeypatch.setenv("CUSTOM_HEADER_HAPP_ONLY", r"x-happ-only|happ-value|^Happ/\d+")
-
-        from importlib import reload
-
-        from src import config as config_module
-        from src import constants as constants_module
-
-        reload(config_module)
-        reload(constants_module)
-
-        from unittest.mock import patch
-
-        from src.web import create_app
+        monkeypatch.setitem(
+            vars(config_module.env_config),
+            "custom_headers",
+            parse_custom_headers({"CUSTOM_HEADER_HAPP_ONLY": r"x-happ-only|happ-value|^Happ/\d+"}),
+        )
 
         app = create_app(app_config)
         client = app.test_client()
 
-        with patch("src.web._is_secure_connection", return_value=True):
+        with patch.object(web_module, "_is_secure_connection", return_value=True):
             # Request with non-Happ user agent
             response1 = client.get(
                 "/secret/user1",
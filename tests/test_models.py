@@ -4,6 +4,10 @@ import pytest
 
 from src.models import Server, UserInfo
 
+# Shared read-only group sets
+_PREMIUM_GROUPS: frozenset[str] = frozenset(["premium"])
+_PREMIUM_VIP_GROUPS: frozenset[str] = frozenset(["premium", "vip"])
+
 
 class TestUserInfo:
     """Tests for UserInfo model."""
@@ -16,7 +20,7 @@ class TestUserInfo:
             spider_x="/test-path",
             comment="Test User",
             link_path="testuser",
-            groups=frozenset(["premium", "vip"]),
+            groups=_PREMIUM_VIP_GROUPS,
         )
 
         assert user.id == "550e8400-e29b-41d4-a716-446655440000"
@@ -24,7 +28,7 @@ class TestUserInfo:
         assert user.spider_x == "/test-path"
         assert user.comment == "Test User"
         assert user.link_path == "testuser"
-        assert user.groups == frozenset(["premium", "vip"])
+        assert user.groups == _PREMIUM_VIP_GROUPS
 
     def test_user_with_defaults(self):
         """Test UserInfo with default values."""
@@ -51,7 +55,7 @@ class TestUserInfo:
 
     def test_is_in_group(self):
         """Test checking if user is in a group."""
-        user = UserInfo(id="test-id", groups=frozenset(["premium", "vip"]))
+        user = UserInfo(id="test-id", groups=_PREMIUM_VIP_GROUPS)
 
         assert user.is_in_group("premium") is True
         assert user.is_in_group("vip") is True
@@ -60,21 +64,21 @@ class TestUserInfo:
 
     def test_has_access_to_groups_with_intersection(self):
         """Test access when user and server share groups."""
-        user = UserInfo(id="test-id", groups=frozenset(["premium", "vip"]))
+        user = UserInfo(id="test-id", groups=_PREMIUM_VIP_GROUPS)
         server_groups = frozenset(["premium", "basic"])
 
         assert user.has_access_to_groups(server_groups) is True
 
     def test_has_access_to_groups_no_intersection(self):
         """Test access when user and server have no common groups."""
-        user = UserInfo(id="test-id", groups=frozenset(["premium"]))
+        user = UserInfo(id="test-id", groups=_PREMIUM_GROUPS)
         server_groups = frozenset(["basic", "default"])
 
         assert user.has_access_to_groups(server_groups) is False
 
     def test_has_access_to_empty_server_groups(self):
         """Test access when server has no groups (public server)."""
-        user = UserInfo(id="test-id", groups=frozenset(["premium"]))
+        user = UserInfo(id="test-id", groups=_PREMIUM_GROUPS)
         server_groups = frozenset()
 
         assert user.has_access_to_groups(server_groups) is True
@@ -82,7 +86,7 @@ class TestUserInfo:
     def test_has_access_with_empty_user_groups(self):
         """Test access when user has no groups but server does."""
         user = UserInfo(id="test-id", groups=frozenset())
-        server_groups = frozenset(["premium"])
+        server_groups = _PREMIUM_GROUPS
 
         assert user.has_access_to_groups(server_groups) is False
 
@@ -108,7 +112,7 @@ class TestServer:
             fixed_id="fixed-uuid",
             fixed_short_id="fixed-short",
             is_external=True,
-            groups=frozenset(["premium", "vip"]),
+            groups=_PREMIUM_VIP_GROUPS,
         )
 
         assert server.host == "test.example.com"
@@ -119,7 +123,7 @@ class TestServer:
         assert server.fixed_id == "fixed-uuid"
         assert server.fixed_short_id == "fixed-short"
         assert server.is_external is True
-        assert server.groups == frozenset(["premium", "vip"])
+        assert server.groups == _PREMIUM_VIP_GROUPS
 
     def test_server_with_defaults(self):
         """Test Server with default values."""
@@ -140,7 +144,7 @@ class TestServer:
         server = Server(
             host="test.example.com",
             description="Test",
-            groups=frozenset(["premium", "vip"]),
+            groups=_PREMIUM_VIP_GROUPS,
         )
 
         assert server.is_in_group("premium") is True
@@ -163,6 +167,25 @@ class TestServer:
 
         assert server.server_name == "test.example.com"
 
+    def test_encoded_fields(self):
+        """Test URL-encoded server name and description."""
+        server = Server(
+            host="test.example.com",
+            description="Test Server #1",
+            alias="sni/alias.example.com",
+        )
+
+        assert server.encoded_server_name == "sni%2Falias.example.com"
+        assert server.encoded_description == "Test%20Server%20%231"
+
+    def test_encoded_fields_ignored_in_equality(self):
+        """Test that derived fields do not affect equality, repr or slots."""
+        server = Server(host="test.example.com", description="Test")
+
+        assert server == Server(host="test.example.com", description="Test")
+        assert "encoded" not in repr(server)
+        assert not hasattr(server, "__dict__")
+
     def test_server_immutability(self):
         """Test that Server is immutable (frozen dataclass)."""
         server = Server(host="test.example.com", description="Test")
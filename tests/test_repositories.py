@@ -1,7 +1,10 @@
 """Tests for repository layer."""
 
+import os
 from pathlib import Path
 
+import pytest
+
 from src.repositories import ConfigRepository, ServerRepository, UserRepository
 
 
@@ -79,6 +82,25 @@ class TestUserRepository:
         assert user is not None
         assert user.link_path == "user/sub"
 
+    def test_find_by_prefix_after_file_change(self, temp_dir: Path):
+        """Test that users with new key lengths are found after a reload."""
+        users_file = temp_dir / "users"
+        users_file.write_text(
+            "550e8400-e29b-41d4-a716-446655440001||user|User 1|\n", encoding="utf-8"
+        )
+
+        repo = UserRepository(users_file)
+        assert repo.find_by_prefix("user-long/path").link_path == "user"
+
+        users_file.write_text(
+            "550e8400-e29b-41d4-a716-446655440001||user|User 1|\n"
+            "550e8400-e29b-41d4-a716-446655440002||user-long|User 2|\n",
+            encoding="utf-8",
+        )
+        repo.invalidate_cache()
+
+        assert repo.find_by_prefix("user-long/path").link_path == "user-long"
+
     def test_find_by_prefix_not_found(self, sample_users_file: Path):
         """Test finding non-existent user."""
         repo = UserRepository(sample_users_file)
@@ -137,6 +159,50 @@ class TestUserRepository:
 
         assert len(users) == 2
 
+    def test_non_canonical_uuid_still_accepted(self, temp_dir: Path):
+        """Test that UUID spellings accepted by uuid.UUID keep working."""
+        users_file = temp_dir / "users"
+        users_file.write_text(
+            "550e8400e29b41d4a716446655440001||user1|User 1|\n"
+            "550E8400-E29B-41D4-A716-446655440002||user2|User 2|\n",
+            encoding="utf-8",
+        )
+
+        users = UserRepository(users_file).get()
+
+        assert set(users) == {"user1", "user2"}
+
+    def test_users_share_group_sets(self, temp_dir: Path):
+        """Test that identical group lists resolve to the same frozenset."""
+        users_file = temp_dir / "users"
+        users_file.write_text(
+            "550e8400-e29b-41d4-a716-446655440001||user1|User 1|vip, eu\n"
+            "550e8400-e29b-41d4-a716-446655440002||user2|User 2|vip, eu\n"
+            "550e8400-e29b-41d4-a716-446655440003||user3|User 3|\n",
+            encoding="utf-8",
+        )
+
+        users = UserRepository(users_file).get()
+
+        assert users["user1"].groups == frozenset({"vip", "eu"})
+        assert users["user1"].groups is users["user2"].groups
+        assert users["user3"].groups == frozenset({"default"})
+
+    def test_crlf_and_undecodable_lines(self, temp_dir: Path):
+        """Test CRLF line endings and skipping lines that are not valid UTF-8."""
+        users_file = temp_dir / "users"
+        users_file.write_bytes(
+            b"# comment\r\n"
+            b"550e8400-e29b-41d4-a716-446655440001||user1|User 1|\r\n"
+            b"550e8400-e29b-41d4-a716-446655440002||user\xff|Broken|\r\n"
+        )
+
+        repo = UserRepository(users_file)
+        users = repo.get()
+
+        assert list(users) == ["user1"]
+        assert users["user1"].comment == "User 1"
+
     def test_missing_file_returns_empty(self, temp_dir: Path):
         """Test that missing file returns empty dict."""
         nonexistent = temp_dir / "nonexistent"
@@ -145,6 +211,13 @@ class TestUserRepository:
 
         assert len(users) == 0
 
+    def test_loaded_users_are_read_only(self, sample_users_file: Path):
+        """The shared cached mapping should reject mutation."""
+        users = UserRepository(sample_users_file).get()
+
+        with pytest.raises(TypeError):
+            users["intruder"] = users["user1"]  # type: ignore[index]
+
 
 class TestServerRepository:
     """Tests for ServerRepository."""
@@ -254,13 +327,19 @@ class TestServerRepository:
         assert len(servers) == 1
 
     def test_missing_file_returns_empty(self, temp_dir: Path):
-        """Test that missing file returns empty list."""
+        """Test that missing file returns empty tuple."""
         nonexistent = temp_dir / "nonexistent"
         repo = ServerRepository(nonexistent)
         servers = repo.get()
 
         assert len(servers) == 0
 
+    def test_loaded_servers_are_immutable(self, sample_servers_file: Path):
+        """The shared cached servers should be handed out as a tuple."""
+        servers = ServerRepository(sample_servers_file).get()
+
+        assert isinstance(servers, tuple)
+
 
 class TestConfigRepository:
     """Tests for profile selection repository logic."""
@@ -377,6 +456,88 @@ proxy-template:
 
         assert repo.get_v2ray_template("cmfa/android") == "cmfa"
 
+    def test_picks_up_profile_added_after_first_lookup(
+        self,
+        sample_servers_file: Path,
+        sample_users_file: Path,
+        sample_v2ray_profile: Path,
+        sample_xray_profile: Path,
+        sample_mihomo_profile: Path,
+    ):
+        """Cached variant listing should refresh when the directory changes."""
+        repo = ConfigRepository(
+            servers_path=sample_servers_file,
+            users_path=sample_users_file,
+            v2ray_profile_path=sample_v2ray_profile,
+            xray_profile_path=sample_xray_profile,
+            mihomo_profile_path=sample_mihomo_profile,
+        )
+        base_template = repo.get_v2ray_template("Mozilla Android")
+
+        variant = sample_v2ray_profile.parent / "v2ray_android.lst"
+        variant.write_text("android-template", encoding="utf-8")
+        stat = variant.parent.stat()
+        os.utime(variant.parent, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+        assert base_template.startswith("vless://")
+        assert repo.get_v2ray_template("Mozilla Android") == "android-template"
+
+    def test_concurrent_lookups_scan_profile_directory_once(
+        self,
+        monkeypatch,
+        sample_servers_file: Path,
+        sample_users_file: Path,
+        sample_v2ray_profile: Path,
+        sample_xray_profile: Path,
+        sample_mihomo_profile: Path,
+    ):
+        """Threads missing the variant cache together should rescan the directory once."""
+        import time
+        from concurrent.futures import ThreadPoolExecutor
+
+        repo = ConfigRepository(
+            servers_path=sample_servers_file,
+            users_path=sample_users_file,
+            v2ray_profile_path=sample_v2ray_profile,
+            xray_profile_path=sample_xray_profile,
+            mihomo_profile_path=sample_mihomo_profile,
+        )
+        scan = repo._scan_profile_variants
+        calls = []
+
+        def slow_scan(base_path: Path):
+            calls.append(base_path)
+            time.sleep(0.05)
+            return scan(base_path)
+
+        monkeypatch.setattr(repo, "_scan_profile_variants", slow_scan)
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(lambda _: repo._get_profile_variants(sample_v2ray_profile), range(8)))
+
+        assert calls == [sample_v2ray_profile]
+
+    def test_text_profile_normalizes_newlines(
+        self,
+        sample_servers_file: Path,
+        sample_users_file: Path,
+        sample_v2ray_profile: Path,
+        sample_xray_profile: Path,
+        sample_mihomo_profile: Path,
+    ):
+        """Text profiles should be stripped and use LF newlines."""
+        sample_v2ray_profile.write_bytes(b"  first\r\nsecond\rthird\r\n")
+
+        repo = ConfigRepository(
+            servers_path=sample_servers_file,
+            users_path=sample_users_file,
+            v2ray_profile_path=sample_v2ray_profile,
+            xray_profile_path=sample_xray_profile,
+            mihomo_profile_path=sample_mihomo_profile,
+        )
+
+        assert repo.get_v2ray_template() == "first\nsecond\nthird"
+
     def test_default_internal_type(self, temp_dir: Path):
         """Test that servers default to internal type."""
         servers_file = temp_dir / "servers"
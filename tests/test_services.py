@@ -205,6 +205,19 @@ class TestGeoFileService:
         assert isinstance(timestamp, int)
         assert timestamp >= 0
 
+    def test_fresh_timestamp_is_served_from_memory(self, temp_dir: Path):
+        """Within the TTL the metadata file should not be read again."""
+        import time
+
+        from src.services import GeoFileService
+
+        service = GeoFileService(cache_dir=temp_dir, cache_ttl=600)
+        service._save_metadata({"last_check": int(time.time()), "last_updated": 123})
+
+        assert service.get_last_updated_timestamp() == 123
+        service.meta_file.unlink()
+        assert service.get_last_updated_timestamp() == 123
+
     def test_build_routing_header(self, temp_dir: Path):
         """Test building routing header."""
         from src.services import GeoFileService
@@ -218,6 +231,43 @@ class TestGeoFileService:
         assert isinstance(header, str)
         assert header.startswith("happ://routing/onadd/") or header == ""
 
+    def test_build_routing_header_reuses_header_until_timestamp_changes(
+        self, monkeypatch, temp_dir: Path
+    ):
+        """Routing header should be rebuilt only when the timestamp changes."""
+        import base64
+        import json
+
+        from src.services import GeoFileService
+
+        service = GeoFileService(cache_dir=temp_dir, cache_ttl=600)
+        template = {"DnsHosts": {}, "Rules": []}
+        timestamps = iter([100, 100, 200])
+        monkeypatch.setattr(service, "get_last_updated_timestamp", lambda: next(timestamps))
+
+        first = service.build_routing_header(template)
+        second = service.build_routing_header(template)
+        third = service.build_routing_header(template)
+
+        assert second is first
+        payload = json.loads(base64.b64decode(third.removeprefix("happ://routing/onadd/")))
+        assert payload["LastUpdated"] == "200"
+        assert "LastUpdated" not in template
+
+    def test_metadata_round_trip_overwrites_existing_file(self, temp_dir: Path):
+        """Saved metadata should replace the previous file and load back."""
+        from src.services import GeoFileService
+
+        service = GeoFileService(cache_dir=temp_dir, cache_ttl=600)
+        service._save_metadata({"last_check": 1})
+        service._save_metadata({"last_check": 2, "urls": {"https://example.com": {"etag": "é"}}})
+
+        assert service._load_metadata() == {
+            "last_check": 2,
+            "urls": {"https://example.com": {"etag": "é"}},
+        }
+        assert not list(temp_dir.glob("*.tmp"))
+
     def test_check_updates_persists_etag(self, monkeypatch, temp_dir: Path):
         """ETag updates should be written back to metadata."""
         from src.services import geo_service as geo_service_module
@@ -240,6 +290,55 @@ class TestGeoFileService:
         assert timestamp == 123
         assert saved_metadata["urls"]["https://example.com/geo.dat"]["etag"] == "etag-1"
 
+    def test_check_updates_gives_each_url_its_own_session(self, monkeypatch, temp_dir: Path):
+        """Concurrent probes must not share a requests session."""
+        from src.services import geo_service as geo_service_module
+        from src.services.geo_service import GeoFileService
+
+        service = GeoFileService(cache_dir=temp_dir, cache_ttl=600)
+        urls = ["https://example.com/geoip.dat", "https://example.com/geosite.dat"]
+        sessions = {}
+
+        monkeypatch.setattr(geo_service_module, "GEO_FILES_URLS", urls)
+        monkeypatch.setattr(service, "_save_metadata", lambda metadata: None)
+
+        def fake_check_url(session, url, url_meta, now):
+            sessions.setdefault(url, []).append(session)
+            return now
+
+        monkeypatch.setattr(service, "_check_url", fake_check_url)
+
+        service._check_updates({}, 123)
+        service._check_updates({}, 456)
+
+        assert sessions[urls[0]][0] is not sessions[urls[1]][0]
+        assert all(first is second for first, second in sessions.values())
+
+    def test_concurrent_refresh_checks_once(self, monkeypatch, temp_dir: Path):
+        """Threads racing on a stale timestamp should trigger a single check."""
+        import time
+        from concurrent.futures import ThreadPoolExecutor
+
+        from src.services.geo_service import GeoFileService
+
+        service = GeoFileService(cache_dir=temp_dir, cache_ttl=600)
+        calls = []
+
+        def fake_check_updates(metadata, now):
+            calls.append(now)
+            time.sleep(0.05)
+            return 321
+
+        monkeypatch.setattr(service, "_check_updates", fake_check_updates)
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            timestamps = list(
+                executor.map(lambda _: service.get_last_updated_timestamp(), range(8))
+            )
+
+        assert timestamps == [321] * 8
+        assert len(calls) == 1
+
     def test_check_url_uses_previous_timestamp_on_request_error(self, temp_dir: Path):
         """Request failures should keep previous timestamp."""
         from src.services.geo_service import GeoFileService
@@ -247,6 +346,9 @@ class TestGeoFileService:
         service = GeoFileService(cache_dir=temp_dir, cache_ttl=600)
 
         class FailingSession:
+            def head(self, *args, **kwargs):
+                raise requests.Timeout("timeout")
+
             def get(self, *args, **kwargs):
                 raise requests.Timeout("timeout")
 
@@ -258,3 +360,42 @@ class TestGeoFileService:
         )
 
         assert timestamp == 456
+
+    def test_check_url_falls_back_to_ranged_get(self, temp_dir: Path):
+        """Servers rejecting HEAD should be probed with a one-byte GET."""
+        from src.services.geo_service import GeoFileService
+
+        service = GeoFileService(cache_dir=temp_dir, cache_ttl=600)
+        calls = []
+
+        class FakeResponse:
+            def __init__(self, status_code, headers=None):
+                self.status_code = status_code
+                self.headers = headers or {}
+
+            def close(self):
+                pass
+
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *args):
+                self.close()
+
+        class FakeSession:
+            def head(self, url, headers, **kwargs):
+                calls.append(("HEAD", dict(headers)))
+                return FakeResponse(405)
+
+            def get(self, url, headers, **kwargs):
+                calls.append(("GET", dict(headers)))
+                return FakeResponse(206, {"Last-Modified": "Wed, 01 Jan 2025 00:00:00 GMT"})
+
+        url_meta = {"last_ts": 100, "last_modified": "Tue, 31 Dec 2024 00:00:00 GMT"}
+        timestamp = service._check_url(FakeSession(), "https://example.com/geo.dat", url_meta, 200)
+
+        assert timestamp == 200
+        assert url_meta["last_modified"] == "Wed, 01 Jan 2025 00:00:00 GMT"
+        assert calls[0] == ("HEAD", {"If-Modified-Since": "Tue, 31 Dec 2024 00:00:00 GMT"})
+        assert calls[1][0] == "GET"
+        assert calls[1][1]["Range"] == "bytes=0-0"
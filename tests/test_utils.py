@@ -1,5 +1,7 @@
 """Tests for utility functions."""
 
+from concurrent.futures import ThreadPoolExecutor
+
 from src.constants import RESERVED_PATHS
 from src.utils import SpiderXGenerator
 
@@ -34,6 +36,41 @@ class TestSpiderXGenerator:
             # Path includes leading '/', so actual content is len(path) - 1
             assert 8 <= len(path) <= 33  # Min 8, max 32 + '/'
 
+    def test_generate_respects_configured_lengths(self, spiderx_generator: SpiderXGenerator):
+        """Test that every path length falls within the configured bounds."""
+        from src.constants import SPIDERX_MAX_LENGTH, SPIDERX_MIN_LENGTH
+
+        for _ in range(200):
+            path = spiderx_generator.generate()
+            assert SPIDERX_MIN_LENGTH <= len(path) - 1 <= SPIDERX_MAX_LENGTH
+
+    def test_generate_serves_paths_from_pool(self, monkeypatch):
+        """Test that one refill serves many generate calls."""
+        generator = SpiderXGenerator()
+        original = generator._generate_candidates
+        calls = []
+
+        def counting_candidates(count):
+            calls.append(count)
+            return original(count)
+
+        monkeypatch.setattr(generator, "_generate_candidates", counting_candidates)
+
+        generator.generate()
+        generator.generate()
+
+        assert len(calls) == 1
+        assert calls[0] > 1
+
+    def test_generate_is_thread_safe(self):
+        """Test that concurrent callers sharing a pool get distinct paths."""
+        generator = SpiderXGenerator()
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            paths = list(executor.map(lambda _: generator.generate(), range(2000)))
+
+        assert len(set(paths)) == len(paths)
+
     def test_reset_clears_cache(self, spiderx_generator: SpiderXGenerator):
         """Test that reset clears the used paths cache."""
         # Generate some paths
@@ -69,6 +106,26 @@ class TestSpiderXGenerator:
         path = generator.generate()
         assert path.startswith("/")
 
+    def test_generate_many_returns_unique_paths(self, spiderx_generator: SpiderXGenerator):
+        """Test that batch generation returns the requested number of unique paths."""
+        paths = spiderx_generator.generate_many(50)
+
+        assert len(paths) == 50
+        assert len(set(paths)) == 50
+        assert all(path.startswith("/") for path in paths)
+
+    def test_generate_many_keeps_generation_order(self, monkeypatch):
+        """Test that batch generation returns paths in the order they were generated."""
+        generator = SpiderXGenerator()
+        produced = iter(["/c", "/a", "/c", "/b"])
+        monkeypatch.setattr(generator, "generate", lambda: next(produced))
+
+        assert generator.generate_many(3) == ["/c", "/a", "/b"]
+
+    def test_generate_many_zero(self, spiderx_generator: SpiderXGenerator):
+        """Test that requesting no paths returns an empty list."""
+        assert spiderx_generator.generate_many(0) == []
+
     def test_fallback_on_collision_attempts(self):
         """Test fallback behavior when max attempts exceeded."""
         # Create generator with small cache
@@ -116,6 +173,40 @@ class TestTextUtils:
         assert "🇺🇸" in result
         assert "USA-01" in result
 
+    def test_decode_unicode_escapes_keeps_existing_non_ascii(self):
+        """Literal non-ASCII text next to escapes should survive unchanged."""
+        from src.utils import decode_unicode_escapes
+
+        assert decode_unicode_escapes(r"Москва \U0001F1F7\U0001F1FA") == "Москва 🇷🇺"
+
+    def test_decode_unicode_escapes_invalid_code_point(self):
+        """Out-of-range code points should leave the text as is."""
+        from src.utils import decode_unicode_escapes
+
+        assert decode_unicode_escapes(r"bad \UFFFFFFFF") == r"bad \UFFFFFFFF"
+
+    def test_decode_unicode_escapes_collapses_escaped_backslash(self):
+        """An escaped backslash decodes to one backslash and does not start an escape."""
+        from src.utils import decode_unicode_escapes
+
+        assert decode_unicode_escapes(r"a\\b \u0041") == "a\\b A"
+        assert decode_unicode_escapes(r"a\\u0041") == "a\\u0041"
+        assert decode_unicode_escapes(r"a\\\u0041") == "a\\A"
+
+    def test_decode_unicode_escapes_decodes_other_python_escapes(self):
+        """Escapes beyond \\u and \\U should decode like the unicode_escape codec."""
+        from src.utils import decode_unicode_escapes
+
+        assert decode_unicode_escapes(r"\u0041\tB\nC") == "A\tB\nC"
+        assert decode_unicode_escapes(r"\u0041 \xe9 \101 \'") == "A é A '"
+        assert decode_unicode_escapes(r"\u0041 \N{BLACK STAR}") == "A ★"
+
+    def test_decode_unicode_escapes_needs_unicode_escape(self):
+        """Text without \\u or \\U escapes should be returned unchanged."""
+        from src.utils import decode_unicode_escapes
+
+        assert decode_unicode_escapes(r"C:\new\x41") == r"C:\new\x41"
+
 
 class TestCacheUtils:
     """Tests for cache utilities."""
@@ -141,6 +232,24 @@ class TestCacheUtils:
         result2 = cache.get(test_file, loader)
         assert result2 == "test content"
 
+    def test_file_cache_loads_once_while_unchanged(self, temp_dir):
+        """Test that cache hits do not call the loader again."""
+        from src.utils import FileCache
+
+        cache = FileCache()
+        test_file = temp_dir / "test.txt"
+        test_file.write_text("test content", encoding="utf-8")
+        calls = []
+
+        def loader(path):
+            calls.append(path)
+            return object()
+
+        first = cache.get(test_file, loader)
+
+        assert cache.get(test_file, loader) is first
+        assert calls == [test_file]
+
     def test_file_cache_invalidation(self, temp_dir):
         """Test cache invalidation on file modification."""
         import time
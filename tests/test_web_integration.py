@@ -1,87 +1,155 @@
 """Integration tests for web application."""
 
+from collections.abc import Generator
 from unittest.mock import patch
 
-from src.models import AppConfig
+import pytest
+from flask import Flask
+from flask.testing import FlaskClient
+
+from src import web as web_module
+from src.builders import MihomoBuilder
+from src.models import AppConfig, Server, UserInfo
+from src.services import ConfigService
 from src.web import _is_allowed_subscription_user_agent, create_app
 
 ALLOWED_BROWSER_UA = "Mozilla/5.0 Chrome/124.0.0.0"
 
+# Mihomo builder with a minimal proxy template, for tests that never reach the template
+_MINIMAL_MIHOMO_BUILDER = MihomoBuilder(
+    template_loader=lambda template_name=None, user_agent="": {"proxy-template": {}}
+)
 
-class TestWebApplication:
-    """Tests for Flask web application."""
 
-    def test_app_creation(self, app_config: AppConfig):
-        """Test that app can be created."""
-        app = create_app(app_config)
+@pytest.fixture
+def web_app(app_config: AppConfig) -> Flask:
+    """Create the Flask app for the default test configuration."""
+    return create_app(app_config)
 
-        assert app is not None
-        assert app.config is not None
 
-    def test_security_blocks_insecure_connections(self, app_config: AppConfig):
-        """Test that insecure connections are blocked."""
-        app = create_app(app_config)
-        client = app.test_client()
+@pytest.fixture
+def client(web_app: Flask) -> FlaskClient:
+    """Create a test client for the default web app."""
+    return web_app.test_client()
 
-        # Mock request without secure headers
-        with patch("src.web._is_secure_connection", return_value=False):
-            response = client.get("/secret/user1")
-            # App redirects to "/" on errors, returns 302
-            assert response.status_code == 302
 
-    def test_localhost_connection_allowed(self, app_config: AppConfig):
-        """Test that localhost connections are allowed."""
-        app = create_app(app_config)
-        client = app.test_client()
+@pytest.fixture
+def config_service(app_config: AppConfig) -> ConfigService:
+    """Create a ConfigService for the default test configuration."""
+    return ConfigService(app_config)
 
-        # Test with localhost (mocked as secure)
-        with patch("src.web._is_secure_connection", return_value=True):
-            # User path that doesn't exist will 404, but should pass security
-            response = client.get("/secret/nonexistent")
-            # Should not be 403 (Forbidden), but likely 404 (Not Found)
-            assert response.status_code != 403
 
-    def test_request_with_user_path(self, app_config: AppConfig):
-        """Test request with valid user path."""
-        app = create_app(app_config)
-        client = app.test_client()
+@pytest.fixture
+def eligible_for_user1(config_service: ConfigService) -> tuple[UserInfo, list[Server]]:
+    """Look up user1 and the servers that user can access."""
+    user = config_service.find_user("user1")
+    assert user is not None
 
-        with patch("src.web._is_secure_connection", return_value=True):
-            response = client.get("/secret/user1", headers={"User-Agent": ALLOWED_BROWSER_UA})
+    servers = config_service.get_servers()
+    eligible = [s for s in servers if not s.groups or user.has_access_to_groups(s.groups)]
+    if not eligible:
+        pytest.skip("user1 has no eligible servers")
 
-            assert response.status_code == 200
-            assert response.mimetype == "application/json"
-            assert response.data.startswith(b"[")
+    return user, eligible
 
-    def test_mihomo_config_format(self, app_config: AppConfig):
-        """Test requesting Mihomo format configuration."""
-        app = create_app(app_config)
-        client = app.test_client()
 
-        with patch("src.web._is_secure_connection", return_value=True):
-            response = client.get(
-                "/secret/user1/config/mihomo",
-                headers={"User-Agent": ALLOWED_BROWSER_UA},
-            )
+class TestWebApplication:
+    """Tests for Flask web application."""
 
-            assert response.status_code == 200
-            assert response.mimetype == "application/yaml"
-            assert b"proxies:" in response.data
+    @pytest.fixture(autouse=True)
+    def _force_secure(self) -> Generator[None]:
+        """Treat requests as secure; tests that need otherwise patch over it."""
+        with patch.object(web_module, "_is_secure_connection", return_value=True):
+            yield
 
-    def test_direct_mihomo_format_alias(self, app_config: AppConfig):
-        """Test requesting Mihomo format via direct alias."""
-        app = create_app(app_config)
-        client = app.test_client()
+    def test_app_creation(self, web_app: Flask):
+        """Test that app can be created."""
+        assert web_app is not None
+        assert web_app.config is not None
+
+    def test_url_map_has_only_secret_path_rules(self, web_app: Flask):
+        """No static route should be registered next to the subscription routes."""
+        assert {rule.endpoint for rule in web_app.url_map.iter_rules()} == {"handle_request"}
+
+    @pytest.mark.parametrize(
+        ("secure", "expected_status"),
+        # App redirects to "/" on errors, so a blocked request returns 302
+        [(False, 302), (True, 200)],
+        ids=["insecure-blocked", "secure-allowed"],
+    )
+    def test_security_gate(self, client: FlaskClient, secure: bool, expected_status: int):
+        """Test that only secure connections reach the subscription handler."""
+        with patch.object(web_module, "_is_secure_connection", return_value=secure):
+            response = client.get("/secret/user1", headers={"User-Agent": ALLOWED_BROWSER_UA})
+
+        assert response.status_code == expected_status
 
-        with patch("src.web._is_secure_connection", return_value=True):
+    def test_remote_connection_rejected_before_flask(self, client: FlaskClient):
+        """Non-local connections should be redirected by the WSGI guard."""
+        with patch.object(web_module, "_is_secure_connection") as flask_check:
             response = client.get(
-                "/secret/user1/mihomo",
-                headers={"User-Agent": ALLOWED_BROWSER_UA},
+                "/secret/user1",
+                environ_base={"REMOTE_ADDR": "203.0.113.1"},
             )
 
-            assert response.status_code == 200
-            assert response.mimetype == "application/yaml"
-            assert b"proxies:" in response.data
+        assert response.status_code == 302
+        assert response.headers["Location"] == "/"
+        flask_check.assert_not_called()
+
+    def test_remote_connection_rejection_is_logged(self, client: FlaskClient, caplog):
+        """The WSGI guard should log rejections like the Flask error handler does."""
+        with caplog.at_level("INFO", logger="src.web"):
+            client.get(
+                "/secret/user1",
+                headers={"User-Agent": ALLOWED_BROWSER_UA, "X-Forwarded-For": "198.51.100.7"},
+                environ_base={"REMOTE_ADDR": "203.0.113.1"},
+            )
+
+        messages = [(record.levelname, record.getMessage()) for record in caplog.records]
+        assert (
+            "WARNING",
+            f"Access denied - Path: /secret/user1 - IP: 198.51.100.7 - UA: {ALLOWED_BROWSER_UA}",
+        ) in messages
+        assert any(
+            level == "INFO" and message.startswith("GET /secret/user1 - Status: 302 - IP: 198.51")
+            for level, message in messages
+        )
+
+    def test_request_with_user_path(self, client: FlaskClient):
+        """Test request with valid user path."""
+        response = client.get("/secret/user1", headers={"User-Agent": ALLOWED_BROWSER_UA})
+
+        assert response.status_code == 200
+        assert response.mimetype == "application/json"
+        assert response.data.startswith(b"[")
+
+    @pytest.mark.parametrize(
+        ("path", "mimetype", "marker"),
+        [
+            ("/secret/user1/config/mihomo", "application/yaml", b"proxies:"),
+            ("/secret/user1/mihomo", "application/yaml", b"proxies:"),
+            ("/secret/user1/sub/v2ray", "text/plain", b"vless://"),
+            ("/secret/user1/config/json", "application/json", b"["),
+        ],
+        ids=["mihomo", "mihomo-alias", "v2ray", "json"],
+    )
+    def test_config_format(self, client: FlaskClient, path: str, mimetype: str, marker: bytes):
+        """Test requesting each configuration format."""
+        response = client.get(path, headers={"User-Agent": ALLOWED_BROWSER_UA})
+
+        assert response.status_code == 200
+        assert response.mimetype == mimetype
+        assert marker in response.data
+
+    def test_format_alias_with_trailing_slash(self, client: FlaskClient):
+        """A trailing slash should not hide the format segment."""
+        response = client.get(
+            "/secret/user1/clash/",
+            headers={"User-Agent": ALLOWED_BROWSER_UA},
+        )
+
+        assert response.status_code == 200
+        assert response.mimetype == "application/yaml"
 
     def test_mihomo_profile_selected_by_user_agent(self, app_config: AppConfig):
         """Matching Mihomo keyword profile should be used for response."""
@@ -101,29 +169,13 @@ proxy-template:
         app = create_app(app_config)
         client = app.test_client()
 
-        with patch("src.web._is_secure_connection", return_value=True):
-            response = client.get(
-                "/secret/user1/mihomo",
-                headers={"User-Agent": "Mozilla/5.0 cmfa/android"},
-            )
-
-            assert response.status_code == 200
-            assert b"profile: cmfa" in response.data
-
-    def test_v2ray_config_format(self, app_config: AppConfig):
-        """Test requesting V2Ray format configuration."""
-        app = create_app(app_config)
-        client = app.test_client()
-
-        with patch("src.web._is_secure_connection", return_value=True):
-            response = client.get(
-                "/secret/user1/sub/v2ray",
-                headers={"User-Agent": ALLOWED_BROWSER_UA},
-            )
+        response = client.get(
+            "/secret/user1/mihomo",
+            headers={"User-Agent": "Mozilla/5.0 cmfa/android"},
+        )
 
-            assert response.status_code == 200
-            assert response.mimetype == "text/plain"
-            assert b"vless://" in response.data
+        assert response.status_code == 200
+        assert b"profile: cmfa" in response.data
 
     def test_v2ray_profile_selected_by_user_agent(self, app_config: AppConfig):
         """Matching V2Ray keyword profile should be used for response."""
@@ -136,29 +188,13 @@ proxy-template:
         app = create_app(app_config)
         client = app.test_client()
 
-        with patch("src.web._is_secure_connection", return_value=True):
-            response = client.get(
-                "/secret/user1/sub/v2ray",
-                headers={"User-Agent": "Mozilla/5.0 cmfa/android"},
-            )
-
-            assert response.status_code == 200
-            assert b"#android-" in response.data
-
-    def test_json_config_format(self, app_config: AppConfig):
-        """Test requesting JSON format configuration."""
-        app = create_app(app_config)
-        client = app.test_client()
-
-        with patch("src.web._is_secure_connection", return_value=True):
-            response = client.get(
-                "/secret/user1/config/json",
-                headers={"User-Agent": ALLOWED_BROWSER_UA},
-            )
+        response = client.get(
+            "/secret/user1/sub/v2ray",
+            headers={"User-Agent": "Mozilla/5.0 cmfa/android"},
+        )
 
-            assert response.status_code == 200
-            assert response.mimetype == "application/json"
-            assert response.data.startswith(b"[")
+        assert response.status_code == 200
+        assert b"#android-" in response.data
 
     def test_json_profile_selected_by_user_agent(self, app_config: AppConfig):
         """Matching Xray keyword profile should be used for response."""
@@ -185,91 +221,50 @@ proxy-template:
         app = create_app(app_config)
         client = app.test_client()
 
-        with patch("src.web._is_secure_connection", return_value=True):
-            response = client.get(
-                "/secret/user1",
-                headers={"User-Agent": "Mozilla/5.0 Android"},
-            )
+        response = client.get(
+            "/secret/user1",
+            headers={"User-Agent": "Mozilla/5.0 Android"},
+        )
 
-            assert response.status_code == 200
-            assert b'"remarks": "Server 1 | android"' in response.data
+        assert response.status_code == 200
+        assert b'"remarks": "Server 1 | android"' in response.data
 
-    def test_invalid_user_returns_404(self, app_config: AppConfig):
+    def test_invalid_user_returns_404(self, client: FlaskClient):
         """Test that invalid user returns 404."""
-        app = create_app(app_config)
-        client = app.test_client()
-
-        with patch("src.web._is_secure_connection", return_value=True):
-            response = client.get("/secret/nonexistent_user")
-
-            # App redirects to "/" on errors (404 becomes 302)
-            assert response.status_code == 302
-
-    def test_user_agent_logging(self, app_config: AppConfig):
-        """Test that user agent is logged."""
-        app = create_app(app_config)
-        client = app.test_client()
-
-        with patch("src.web._is_secure_connection", return_value=True):
-            # Request with specific user agent
-            response = client.get(
-                "/secret/user1",
-                headers={"User-Agent": "Happ/4.7.1/ios/2604040141682"},
-            )
-
-            assert response.status_code == 200
-
-    def test_x_forwarded_for_header(self, app_config: AppConfig):
-        """Test X-Forwarded-For header processing."""
-        app = create_app(app_config)
-        client = app.test_client()
-
-        with patch("src.web._is_secure_connection", return_value=True):
-            response = client.get(
-                "/secret/user1",
-                headers={
-                    "User-Agent": ALLOWED_BROWSER_UA,
-                    "X-Forwarded-For": "203.0.113.1",
-                },
-            )
-
-            assert response.status_code == 200
-
-    def test_https_proxy_header(self, app_config: AppConfig):
-        """Test HTTPS proxy headers."""
-        app = create_app(app_config)
-        client = app.test_client()
-
-        # When X-Forwarded-Proto is https, should be allowed
-        with patch("src.web._is_secure_connection", return_value=True):
-            response = client.get(
-                "/secret/user1",
-                headers={
-                    "User-Agent": ALLOWED_BROWSER_UA,
-                    "X-Forwarded-Proto": "https",
-                },
-            )
-
-            assert response.status_code == 200
-
-    def test_yandex_browser_user_agent_blocked(self, app_config: AppConfig):
+        response = client.get("/secret/nonexistent_user")
+
+        # App redirects to "/" on errors (404 becomes 302)
+        assert response.status_code == 302
+
+    @pytest.mark.parametrize(
+        "headers",
+        [
+            {"User-Agent": "Happ/4.7.1/ios/2604040141682"},
+            {"User-Agent": ALLOWED_BROWSER_UA, "X-Forwarded-For": "203.0.113.1"},
+            {"User-Agent": ALLOWED_BROWSER_UA, "X-Forwarded-Proto": "https"},
+        ],
+        ids=["happ-user-agent", "x-forwarded-for", "x-forwarded-proto"],
+    )
+    def test_request_headers_accepted(self, client: FlaskClient, headers: dict[str, str]):
+        """Test that client and proxy headers are processed without errors."""
+        response = client.get("/secret/user1", headers=headers)
+
+        assert response.status_code == 200
+
+    def test_yandex_browser_user_agent_blocked(self, client: FlaskClient):
         """Test that Yandex Browser is blocked by user-agent policy."""
-        app = create_app(app_config)
-        client = app.test_client()
-
-        with patch("src.web._is_secure_connection", return_value=True):
-            response = client.get(
-                "/secret/user1",
-                headers={
-                    "User-Agent": (
-                        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
-                        "(KHTML, like Gecko) Chrome/123.0.0.0 YaBrowser/24.4.1.0 Safari/537.36"
-                    )
-                },
-            )
+        response = client.get(
+            "/secret/user1",
+            headers={
+                "User-Agent": (
+                    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+                    "(KHTML, like Gecko) Chrome/123.0.0.0 YaBrowser/24.4.1.0 Safari/537.36"
+                )
+            },
+        )
 
-            # 403 is handled by redirecting to root
-            assert response.status_code == 302
+        # 403 is handled by redirecting to root
+        assert response.status_code == 302
 
 
 class TestUserAgentPolicy:
@@ -319,54 +314,23 @@ class TestUserAgentPolicy:
 class TestConfigGeneration:
     """Tests for configuration generation flow."""
 
-    def test_generate_mihomo_for_valid_user(self, app_config: AppConfig):
-        """Test generating Mihomo config for user with server access."""
-        from src.services import ConfigService
-
-        service = ConfigService(app_config)
-        user = service.find_user("user1")
-
-        assert user is not None
-
-        servers = service.get_servers()
-        # Filter servers user has access to
-        eligible = [s for s in servers if not s.groups or user.has_access_to_groups(s.groups)]
-
-        if eligible:
-            result = service.build_mihomo_config(eligible, user)
-            assert isinstance(result, bytes)
-            assert len(result) > 0
-
-    def test_generate_v2ray_for_valid_user(self, app_config: AppConfig):
-        """Test generating V2Ray config for user with server access."""
-        from src.services import ConfigService
-
-        service = ConfigService(app_config)
-        user = service.find_user("user1")
-
-        assert user is not None
-
-        servers = service.get_servers()
-        # Filter servers user has access to
-        eligible = [s for s in servers if not s.groups or user.has_access_to_groups(s.groups)]
-
-        if eligible:
-            result = service.build_v2ray_config(eligible, user)
-            assert isinstance(result, bytes)
-            assert len(result) > 0
-
-    def test_no_servers_raises_error(self, app_config: AppConfig):
+    @pytest.mark.parametrize("method", ["build_mihomo_config", "build_v2ray_config"])
+    def test_generate_for_valid_user(
+        self,
+        config_service: ConfigService,
+        eligible_for_user1: tuple[UserInfo, list[Server]],
+        method: str,
+    ):
+        """Test generating each config format for user with server access."""
+        user, eligible = eligible_for_user1
+
+        result = getattr(config_service, method)(eligible, user)
+        assert isinstance(result, bytes)
+        assert len(result) > 0
+
+    def test_no_servers_raises_error(self):
         """Test that building config with no servers raises error."""
-        from src.builders import MihomoBuilder
-        from src.models import UserInfo
-
         user = UserInfo(id="test-id", groups=frozenset(["admin"]))
-        builder = MihomoBuilder(
-            template_loader=lambda template_name=None, user_agent="": {"proxy-template": {}}
-        )
 
-        try:
-            builder.build([], user)
-            raise AssertionError("Expected ValueError for no servers")
-        except ValueError:
-            pass  # Expected
+        with pytest.raises(ValueError):
+            _MINIMAL_MIHOMO_BUILDER.build([], user)